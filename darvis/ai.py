@@ -2,23 +2,72 @@
 AI integration and intelligent response functionality.
 """
 
+import codecs
+import os
+import re
+import selectors
 import subprocess
-from typing import Tuple
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional, Tuple
 
-# Global conversation state
-conversation_history = []
-current_ai_process = None
+from .apps import resolve_command
+
+
+@dataclass(slots=True)
+class AISession:
+    """Conversation state for the active AI backend."""
+
+    history: list = field(default_factory=list)
+    process: Optional[subprocess.Popen] = None
+    backend: str = "claude"  # "claude" | "ollama"
+    ollama_model: Optional[str] = None  # active Ollama model when backend is "ollama"
+
+
+# The conversation shared by the desktop GUI and the web chat
+session = AISession()
+
+# Seconds to wait for the AI CLI before giving up on a query
+AI_TIMEOUT = 60
+
+# Phrases that mark a query as obviously meant for the AI
+AI_INDICATORS = (
+    "what",
+    "how",
+    "why",
+    "explain",
+    "tell me",
+    "calculate",
+    "solve",
+    "convert",
+    "translate",
+    "write",
+    "create",
+    "generate",
+    "code",
+)
+# The indicators compiled into one alternation, so a query is scanned once
+_AI_INDICATOR_RE = re.compile("|".join(map(re.escape, AI_INDICATORS)), re.IGNORECASE)
+# Single-word indicators, for the common query that starts with one
+_AI_FIRST_WORDS = frozenset(i for i in AI_INDICATORS if " " not in i)
 
 CLAUDE_MODEL = "claude-sonnet-4-6"
-AI_BACKEND = "claude"   # "claude" | "ollama"
-OLLAMA_MODEL = None     # active Ollama model name when backend is "ollama"
 
 
 def get_available_ollama_models() -> list:
     """Return model names from `ollama ls`, empty list on failure."""
+    ollama = resolve_command("ollama")
+    if not ollama:
+        return []
     try:
+        # An absolute path with close_fds=False lets CPython use posix_spawn
+        # for this short-lived helper instead of fork/exec
         result = subprocess.run(
-            ["ollama", "ls"], capture_output=True, text=True, timeout=10
+            [ollama, "ls"],
+            capture_output=True,
+            text=True,
+            timeout=10,
+            close_fds=False,
         )
         if result.returncode != 0:
             return []
@@ -35,32 +84,85 @@ def get_available_ollama_models() -> list:
 
 def set_ai_backend(backend: str, model: str = None) -> None:
     """Switch the active AI backend.  backend: 'claude' | 'ollama'"""
-    global AI_BACKEND, OLLAMA_MODEL
-    AI_BACKEND = backend
-    OLLAMA_MODEL = model
+    session.backend = backend
+    session.ollama_model = model
+
+
+def _read_output(
+    process: subprocess.Popen, on_chunk: Optional[Callable[[str], None]] = None
+) -> Tuple[str, str, bool]:
+    """
+    Read stdout and stderr of an AI process until both close or AI_TIMEOUT.
+
+    Both pipes are multiplexed through one selector on this thread, so a
+    chatty stderr can't stall stdout and no helper threads are needed. Both
+    pipes are closed before returning.
+
+    Returns:
+        Tuple of (stdout, stderr, timed_out)
+    """
+    try:
+        deadline = time.monotonic() + AI_TIMEOUT
+        decoders = {}
+        chunks = {}
+        with selectors.DefaultSelector() as selector:
+            for name, pipe in (("stdout", process.stdout), ("stderr", process.stderr)):
+                selector.register(pipe, selectors.EVENT_READ, name)
+                decoders[name] = codecs.getincrementaldecoder("utf-8")(errors="replace")
+                chunks[name] = []
+
+            while selector.get_map():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    process.kill()
+                    process.wait()
+                    return "", "", True
+                for key, _ in selector.select(timeout=remaining):
+                    data = os.read(key.fd, 4096)
+                    if not data:
+                        selector.unregister(key.fileobj)
+                        text = decoders[key.data].decode(b"", final=True)
+                    else:
+                        text = decoders[key.data].decode(data)
+                    if not text:
+                        continue
+                    chunks[key.data].append(text)
+                    if on_chunk and key.data == "stdout":
+                        on_chunk(text)
+    finally:
+        # communicate() used to close these; don't leave them to the GC
+        process.stdout.close()
+        process.stderr.close()
+
+    process.wait()
+    return "".join(chunks["stdout"]), "".join(chunks["stderr"]), False
 
 
-def process_ai_query(query: str) -> Tuple[str, str]:
+def process_ai_query(
+    query: str, on_chunk: Optional[Callable[[str], None]] = None
+) -> Tuple[str, str]:
     """
     Process a query using AI assistance.
 
-    Uses the Claude CLI directly when AI_BACKEND == 'claude', or
+    Uses the Claude CLI directly when session.backend == 'claude', or
     `ollama launch claude` with the selected Ollama model otherwise.
 
     Args:
         query: The user's query to process
+        on_chunk: Optional callback invoked with each piece of output as the
+                  CLI produces it, so callers can display partial responses
 
     Returns:
         Tuple of (response_text, session_marker)
     """
-    global current_ai_process
-
-    is_first = len(conversation_history) == 0
-    conversation_history.append(query)
+    backend = session.backend
+    is_first = len(session.history) == 0
+    session.history.append(query)
 
     try:
-        if AI_BACKEND == "ollama" and OLLAMA_MODEL:
-            base = ["ollama", "launch", "claude", "--model", OLLAMA_MODEL, "--yes", "--"]
+        ollama_model = session.ollama_model
+        if backend == "ollama" and ollama_model:
+            base = ["ollama", "launch", "claude", "--model", ollama_model, "--yes", "--"]
             command = base + (["-p", query] if is_first else ["-c", "-p", query])
         else:
             command = (
@@ -70,73 +172,97 @@ def process_ai_query(query: str) -> Tuple[str, str]:
             )
 
         print(f"DEBUG: Executing command: {' '.join(command)}")
-        current_ai_process = subprocess.Popen(
-            command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, start_new_session=True
+        process = subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=0,
+            start_new_session=True,
         )
-        print("DEBUG: process started, waiting for output...")
+        session.process = process
+        print("DEBUG: process started, streaming output...")
+
         try:
-            stdout, stderr = current_ai_process.communicate(timeout=60)
-            print(f"DEBUG: process completed with returncode={current_ai_process.returncode}")
-            print(f"DEBUG: stdout len={len(stdout) if stdout else 0}, stderr len={len(stderr) if stderr else 0}")
-            print(f"DEBUG: stdout={repr(stdout[:500]) if stdout else 'empty'}")
-            print(f"DEBUG: stderr={repr(stderr[:500]) if stderr else 'empty'}")
-            result = subprocess.CompletedProcess(
-                command, current_ai_process.returncode, stdout, stderr
-            )
-        except subprocess.TimeoutExpired:
-            print("DEBUG: process timed out, killing...")
-            current_ai_process.kill()
-            stdout, stderr = current_ai_process.communicate()
-            print(f"DEBUG: killed process, got stdout={stdout[:200] if stdout else 'none'}")
-            return "AI query timed out", ""
+            stdout, stderr, timed_out = _read_output(process, on_chunk)
         finally:
-            current_ai_process = None
+            session.process = None
+
+        if timed_out:
+            print("DEBUG: process timed out and was killed")
+            return "AI query timed out", ""
 
-        if result.returncode != 0 and stderr:
+        print(f"DEBUG: process completed with returncode={process.returncode}")
+        if process.returncode != 0 and stderr:
             print(f"DEBUG: stderr: {stderr}")
 
-        response = (result.stdout or "").strip() or "No response"
-        return response, AI_BACKEND
+        response = stdout.strip() or "No response"
+        return response, backend
 
-    except subprocess.TimeoutExpired:
-        return "AI query timed out", ""
     except FileNotFoundError:
-        backend_name = "ollama" if AI_BACKEND == "ollama" else "claude"
+        backend_name = "ollama" if backend == "ollama" else "claude"
         return f"AI assistance not available ({backend_name} not found)", ""
     except Exception as e:
         return f"AI error: {str(e)}", ""
 
 
+def _wait_for_exit(process: subprocess.Popen, timeout: float) -> bool:
+    """
+    Wait up to timeout seconds for a process to exit.
+
+    On Linux the wait sleeps on a pidfd until the kernel reports the exit;
+    elsewhere it falls back to Popen.wait(), which polls.
+
+    Returns:
+        True if the process exited, False if the timeout expired
+    """
+    try:
+        pidfd = os.pidfd_open(process.pid)
+    except (AttributeError, OSError):
+        try:
+            process.wait(timeout=timeout)
+            return True
+        except subprocess.TimeoutExpired:
+            return False
+
+    try:
+        with selectors.DefaultSelector() as selector:
+            selector.register(pidfd, selectors.EVENT_READ)
+            if not selector.select(timeout):
+                return False
+    finally:
+        os.close(pidfd)
+    process.wait()  # Already exited; this just reaps it
+    return True
+
+
 def cancel_ai_request() -> bool:
     """Cancel the current AI request if one is running.
 
     Returns:
         True if a request was cancelled, False if no request was running
     """
-    global current_ai_process
-    if current_ai_process and current_ai_process.poll() is None:
+    process = session.process
+    if process and process.poll() is None:
         try:
-            current_ai_process.terminate()
+            process.terminate()
             # Wait a bit for graceful termination
-            try:
-                current_ai_process.wait(timeout=2)
-            except subprocess.TimeoutExpired:
+            if not _wait_for_exit(process, 2):
                 # Force kill if it doesn't terminate gracefully
-                current_ai_process.kill()
-                current_ai_process.wait()
-            current_ai_process = None
+                process.kill()
+                process.wait()
+            session.process = None
             return True
         except Exception:
-            current_ai_process = None
+            session.process = None
             return False
     return False
 
 
 def reset_ai_session() -> None:
     """Reset the AI conversation session."""
-    global conversation_history
-    conversation_history = []
-    if current_ai_process:
+    session.history = []
+    if session.process:
         cancel_ai_request()
 
 
@@ -153,23 +279,7 @@ def is_ai_command(query: str) -> bool:
     Returns:
         True if the query should use AI, False for local processing
     """
-    query_lower = query.lower()
-
-    # Handle obvious AI queries
-    ai_indicators = [
-        "what",
-        "how",
-        "why",
-        "explain",
-        "tell me",
-        "calculate",
-        "solve",
-        "convert",
-        "translate",
-        "write",
-        "create",
-        "generate",
-        "code",
-    ]
-
-    return any(indicator in query_lower for indicator in ai_indicators)
+    head = query.lstrip().partition(" ")[0].lower()
+    if head in _AI_FIRST_WORDS:
+        return True
+    return _AI_INDICATOR_RE.search(query) is not None
@@ -2,21 +2,149 @@
 Application detection and launching functionality.
 """
 
-import glob
+import functools
+import hashlib
+import json
 import os
+import shutil
 import subprocess
+import tempfile
+import webbrowser
 
 
 from .config import (
     DESKTOP_DIRS,
-    get_desktop_dirs,
-    is_macos,
-    is_linux,
-    MACOS_APP_MAPPINGS,
-    get_open_command,
+    IS_LINUX,
+    IS_MACOS,
+    OPEN_COMMAND,
+    RESOLVED_APPS_CACHE,
+    WEB_SERVICES,
+    iter_desktop_files,
+    lookup_macos_app,
 )
 
 
+# Extended app mapping with common variations (Linux-focused), checked
+# in order before falling back to .desktop files and PATH variations
+APP_MAP = {
+    "chrome": ("chromium", "google-chrome", "chrome"),
+    "browser": ("firefox", "chromium", "chrome"),
+    "firefox": ("firefox",),
+    "chromium": ("chromium",),
+    "terminal": ("xterm", "gnome-terminal", "konsole", "terminator", "alacritty"),
+    "editor": (
+        "gedit",
+        "kate",
+        "mousepad",
+        "leafpad",
+        "nano",
+        "vim",
+        "code",
+        "vscode",
+    ),
+    "gedit": ("gedit",),
+    "calculator": ("galculator", "gnome-calculator", "kcalc", "speedcrunch"),
+    "galculator": ("galculator",),
+    "bluetooth manager": ("blueman-manager",),
+    "bluetooth": ("blueman-manager",),
+    "bluetooth adapters": ("blueman-adapters",),
+    "system settings": ("gnome-settings-daemon", "systemsettings"),
+    "settings": ("gnome-control-center", "systemsettings"),
+    "network manager": ("nm-connection-editor", "networkmanager"),
+    "printer settings": ("system-config-printer",),
+    "volume control": ("pavucontrol", "alsamixer"),
+    "sound settings": ("pavucontrol",),
+    "display settings": ("arandr", "gnome-display-panel"),
+    "steam": ("steam", "steam-runtime", "/usr/bin/steam"),
+    "lutris": ("lutris",),
+    "heroic": ("heroic", "heroic-launcher"),
+    "proton": ("proton", "proton-ge"),
+    "wine": ("wine",),
+    "playonlinux": ("playonlinux",),
+    "bottles": ("bottles",),
+    "signal": ("signal-desktop", "signal"),
+    "discord": ("discord", "discord-canary"),
+    "slack": ("slack",),
+    "spotify": ("spotify",),
+    "vlc": ("vlc",),
+    "code": ("code", "vscode"),
+    "sublime": ("subl", "sublime-text"),
+    "atom": ("atom",),
+    "thunderbird": ("thunderbird",),
+    "libreoffice": ("libreoffice", "lowriter"),
+    "gimp": ("gimp",),
+    "inkscape": ("inkscape",),
+    "blender": ("blender",),
+    "krita": ("krita",),
+    # Productivity apps
+    "obsidian": ("obsidian",),
+    "notion": ("notion", "notion-app"),
+    "evernote": ("evernote",),
+    "onenote": ("onenote",),
+    "zoom": ("zoom", "zoom-client"),
+    "teams": ("teams", "teams-for-linux"),
+    "skype": ("skype", "skypeforlinux"),
+    "whatsapp": ("whatsapp", "whatsapp-desktop"),
+    "telegram": ("telegram", "telegram-desktop"),
+    # Development tools
+    "postman": ("postman",),
+    "insomnia": ("insomnia",),
+    "dbeaver": ("dbeaver",),
+    "mysql-workbench": ("mysql-workbench",),
+    # Graphics and media
+    "scribus": ("scribus",),
+    "audacity": ("audacity",),
+    "kdenlive": ("kdenlive",),
+    "shotcut": ("shotcut",),
+    # Office and documents
+    "onlyoffice": ("onlyoffice", "onlyoffice-desktopeditors"),
+    "wps": ("wps", "wps-office"),
+}
+
+# Suffixes tried on the bare app name when nothing else matches
+COMMAND_SUFFIXES = (
+    "-desktop",
+    ".bin",
+    ".sh",
+    "-linux",
+    "-client",
+    "-app",
+    ".AppImage",
+    "-flatpak",
+)
+
+
+# Lowercase entry name -> path for each app directory, with the directory's
+# mtime when it was listed
+_app_dir_index_cache = {}
+
+
+def _app_dir_index(app_dir: str) -> dict:
+    """
+    Return the entries of an app directory keyed by lowercase name.
+
+    The listing is reused until the directory's mtime changes, so repeat
+    lookups cost one stat instead of a full listdir.
+
+    Args:
+        app_dir: Directory to index, e.g. /Applications
+
+    Returns:
+        Mapping of lowercase entry name to full path, empty if unreadable
+    """
+    try:
+        mtime = os.stat(app_dir).st_mtime_ns
+        cached = _app_dir_index_cache.get(app_dir)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        with os.scandir(app_dir) as entries:
+            index = {entry.name.lower(): entry.path for entry in entries}
+    except OSError:
+        return {}
+    _app_dir_index_cache[app_dir] = (mtime, index)
+    return index
+
+
 def find_macos_app(app_name: str) -> str:
     """
     Find macOS .app bundle paths.
@@ -29,39 +157,145 @@ def find_macos_app(app_name: str) -> str:
     """
     app_name_lower = app_name.lower()
 
-    # Check macOS-specific mappings first
-    if app_name_lower in MACOS_APP_MAPPINGS:
-        for app_path in MACOS_APP_MAPPINGS[app_name_lower]:
-            if os.path.exists(app_path):
-                return app_path
-
-    # Search in Applications directories
-    for app_dir in get_desktop_dirs():
-        if os.path.exists(app_dir):
-            # Try exact match
-            exact_path = os.path.join(app_dir, f"{app_name}.app")
-            if os.path.exists(exact_path):
-                return exact_path
-
-            # Try case-insensitive search
-            try:
-                for item in os.listdir(app_dir):
-                    if item.lower() == f"{app_name_lower}.app":
-                        full_path = os.path.join(app_dir, item)
-                        if os.path.exists(full_path):
-                            return full_path
-            except (OSError, PermissionError):
-                continue
+    # Check macOS-specific mappings first, answered from the cached
+    # directory listings rather than a stat per candidate
+    for app_path in lookup_macos_app(app_name_lower):
+        app_dir, bundle = os.path.split(app_path)
+        if bundle.lower() in _app_dir_index(app_dir):
+            return app_path
+
+    # Search in Applications directories, case-insensitively
+    bundle_name = f"{app_name_lower}.app"
+    for app_dir in _existing_desktop_dirs():
+        app_path = _app_dir_index(app_dir).get(bundle_name)
+        if app_path:
+            return app_path
 
     return ""  # Not found
 
 
+# Commands found by find_app_command(), keyed by lowercase app name. Misses
+# aren't kept, so apps installed later are found on the next lookup.
+_app_command_cache = {}
+
+# Commands found in earlier runs, loaded from RESOLVED_APPS_CACHE on first use
+_resolved_apps = None
+
+
+def clear_app_command_cache() -> None:
+    """Forget resolved app commands so the next lookup scans again."""
+    _app_command_cache.clear()
+
+
+def _path_hash() -> str:
+    """Fingerprint of PATH, so saved lookups are dropped when it changes."""
+    return hashlib.sha1(os.environ.get("PATH", "").encode()).hexdigest()
+
+
+def _load_resolved_apps() -> dict:
+    """Return the commands saved by earlier runs, if PATH is unchanged."""
+    global _resolved_apps
+    if _resolved_apps is None:
+        _resolved_apps = {}
+        try:
+            data = json.loads(RESOLVED_APPS_CACHE.read_text(encoding="utf-8"))
+            apps = data.get("apps")
+            if data.get("path_hash") == _path_hash() and isinstance(apps, dict):
+                # Skip anything a hand-edited or corrupt file put there
+                _resolved_apps = {
+                    name: command
+                    for name, command in apps.items()
+                    if isinstance(command, str)
+                }
+        except (OSError, ValueError, AttributeError):
+            pass
+    return _resolved_apps
+
+
+def _write_resolved_apps(resolved: dict) -> None:
+    """Replace RESOLVED_APPS_CACHE with the given commands."""
+    tmp_name = None
+    try:
+        RESOLVED_APPS_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        # A unique temp file, so concurrent runs never write the same one
+        with tempfile.NamedTemporaryFile(
+            "w",
+            dir=RESOLVED_APPS_CACHE.parent,
+            suffix=".tmp",
+            delete=False,
+            encoding="utf-8",
+        ) as tmp:
+            tmp_name = tmp.name
+            json.dump({"path_hash": _path_hash(), "apps": resolved}, tmp)
+        os.replace(tmp_name, RESOLVED_APPS_CACHE)
+    except OSError:
+        if tmp_name:
+            try:
+                os.remove(tmp_name)
+            except OSError:
+                pass
+
+
+def _save_resolved_app(app_name_lower: str, command: str) -> None:
+    """Remember a found command in RESOLVED_APPS_CACHE for future runs."""
+    resolved = _load_resolved_apps()
+    resolved[app_name_lower] = command
+    _write_resolved_apps(resolved)
+
+
+def _forget_app_command(app_name_lower: str, command: str) -> None:
+    """Drop a command that failed to launch, so the next lookup searches again."""
+    _app_command_cache.pop(app_name_lower, None)
+    _resolved_commands.pop(command, None)
+    _forget_desktop_dirs()
+    resolved = _load_resolved_apps()
+    if resolved.pop(app_name_lower, None) is not None:
+        _write_resolved_apps(resolved)
+
+
+def _is_launchable(command: str) -> bool:
+    """Check a previously found command still exists."""
+    if command.endswith(".app"):
+        return os.path.isdir(command)
+    return is_command_available(command)
+
+
+def refresh_apps() -> None:
+    """Forget every cached app lookup, e.g. after installing an application.
+
+    Clears resolved app commands (including those saved in
+    RESOLVED_APPS_CACHE), the list of existing app directories, the .desktop
+    file index and PATH lookups, so the next open_app() sees the system as
+    it is now.
+    """
+    global _resolved_apps
+    clear_app_command_cache()
+    _resolved_apps = {}
+    try:
+        os.remove(RESOLVED_APPS_CACHE)
+    except OSError:
+        pass
+    _app_dir_index_cache.clear()
+    _resolved_commands.clear()
+    _forget_desktop_dirs()
+
+
+def _forget_desktop_dirs() -> None:
+    """Rescan the desktop directories on the next lookup."""
+    _existing_desktop_dirs.cache_clear()
+    _desktop_index.cache_clear()
+
+
 def find_app_command(app_name: str) -> str:
     """
     Find the correct command to launch an application.
 
     Checks .desktop files, PATH, and common command variations.
     Platform-specific: uses .desktop files on Linux, .app bundles on macOS.
+    Found commands are memoized per lowercase name, so repeat lookups skip
+    the filesystem scan until clear_app_command_cache() is called, and are
+    saved to RESOLVED_APPS_CACHE, so a later run only checks the saved
+    command still exists. Misses are never memoized.
 
     Args:
         app_name: Name of the application to find
@@ -70,182 +304,184 @@ def find_app_command(app_name: str) -> str:
         Command string to execute, or empty string if not found
     """
     app_name_lower = app_name.lower()
-
+    try:
+        return _app_command_cache[app_name_lower]
+    except KeyError:
+        pass
+    command = _load_resolved_apps().get(app_name_lower, "")
+    if not (command and _is_launchable(command)):
+        command = _search_app_command(app_name, app_name_lower)
+        if not command:
+            return ""
+        _save_resolved_app(app_name_lower, command)
+    _app_command_cache[app_name_lower] = command
+    return command
+
+
+def _search_app_command(app_name: str, app_name_lower: str) -> str:
+    """Scan mappings, .desktop files and PATH for an app's launch command."""
     # macOS-specific handling
-    if is_macos():
+    if IS_MACOS:
         macos_app = find_macos_app(app_name)
         if macos_app:
             return macos_app
 
-    # Extended app mapping with common variations (Linux-focused)
-    app_map = {
-        "chrome": ["chromium", "google-chrome", "chrome"],
-        "browser": ["firefox", "chromium", "chrome"],
-        "firefox": ["firefox"],
-        "chromium": ["chromium"],
-        "terminal": ["xterm", "gnome-terminal", "konsole", "terminator", "alacritty"],
-        "editor": [
-            "gedit",
-            "kate",
-            "mousepad",
-            "leafpad",
-            "nano",
-            "vim",
-            "code",
-            "vscode",
-        ],
-        "gedit": ["gedit"],
-        "calculator": ["galculator", "gnome-calculator", "kcalc", "speedcrunch"],
-        "galculator": ["galculator"],
-        "bluetooth manager": ["blueman-manager"],
-        "bluetooth": ["blueman-manager"],
-        "bluetooth adapters": ["blueman-adapters"],
-        "system settings": ["gnome-settings-daemon", "systemsettings"],
-        "settings": ["gnome-control-center", "systemsettings"],
-        "network manager": ["nm-connection-editor", "networkmanager"],
-        "printer settings": ["system-config-printer"],
-        "volume control": ["pavucontrol", "alsamixer"],
-        "sound settings": ["pavucontrol"],
-        "display settings": ["arandr", "gnome-display-panel"],
-        "steam": ["steam", "steam-runtime", "/usr/bin/steam"],
-        "lutris": ["lutris"],
-        "heroic": ["heroic", "heroic-launcher"],
-        "proton": ["proton", "proton-ge"],
-        "wine": ["wine"],
-        "playonlinux": ["playonlinux"],
-        "bottles": ["bottles"],
-        "signal": ["signal-desktop", "signal"],
-        "discord": ["discord", "discord-canary"],
-        "slack": ["slack"],
-        "spotify": ["spotify"],
-        "vlc": ["vlc"],
-        "code": ["code", "vscode"],
-        "sublime": ["subl", "sublime-text"],
-        "atom": ["atom"],
-        "thunderbird": ["thunderbird"],
-        "libreoffice": ["libreoffice", "lowriter", "libreoffice"],
-        "gimp": ["gimp"],
-        "inkscape": ["inkscape"],
-        "blender": ["blender"],
-        "krita": ["krita", "krita"],
-        # Productivity apps
-        "obsidian": ["obsidian"],
-        "notion": ["notion", "notion-app"],
-        "evernote": ["evernote"],
-        "onenote": ["onenote"],
-        "zoom": ["zoom", "zoom-client"],
-        "teams": ["teams", "teams-for-linux"],
-        "skype": ["skype", "skypeforlinux"],
-        "whatsapp": ["whatsapp", "whatsapp-desktop"],
-        "telegram": ["telegram", "telegram-desktop"],
-        # Development tools
-        "postman": ["postman"],
-        "insomnia": ["insomnia"],
-        "dbeaver": ["dbeaver"],
-        "mysql-workbench": ["mysql-workbench"],
-        # Graphics and media
-        "scribus": ["scribus"],
-        "audacity": ["audacity"],
-        "kdenlive": ["kdenlive"],
-        "shotcut": ["shotcut"],
-        # Office and documents
-        "onlyoffice": ["onlyoffice", "onlyoffice-desktopeditors"],
-        "wps": ["wps", "wps-office"],
-    }
-
     # Check if we have a direct mapping
-    if app_name_lower in app_map:
-        for cmd in app_map[app_name_lower]:
-            if is_command_available(cmd):
-                return cmd
+    for cmd in APP_MAP.get(app_name_lower, ()):
+        if is_command_available(cmd):
+            return cmd
 
     # Check .desktop files in standard locations (Linux only)
-    if is_linux():
-        for desktop_dir in DESKTOP_DIRS:
-            if os.path.exists(desktop_dir):
-                # Look for .desktop files that match the app name
-                # Try multiple variations: original, spaces replaced with hyphens, underscores
-                search_patterns = [
-                    f"*{app_name_lower}*.desktop",
-                    f"*{app_name_lower.replace(' ', '-')}.desktop",
-                    f"*{app_name_lower.replace(' ', '_')}.desktop",
-                ]
-
-                for pattern in search_patterns:
-                    for desktop_file in glob.glob(os.path.join(desktop_dir, pattern)):
-                        try:
-                            exec_cmd = parse_desktop_file(desktop_file)
-                            if exec_cmd and is_command_available(exec_cmd.split()[0]):
-                                return exec_cmd
-                        except (OSError, IOError, ValueError):
-                            continue
-
-                # Also check for exact matches with various naming patterns
-                exact_patterns = [
-                    f"{app_name_lower}.desktop",
-                    f"{app_name_lower.replace(' ', '-')}.desktop",
-                    f"{app_name_lower.replace(' ', '_')}.desktop",
-                ]
-
-                for exact_pattern in exact_patterns:
-                    exact_desktop = os.path.join(desktop_dir, exact_pattern)
-                    if os.path.exists(exact_desktop):
-                        try:
-                            exec_cmd = parse_desktop_file(exact_desktop)
-                            if exec_cmd and is_command_available(exec_cmd.split()[0]):
-                                return exec_cmd
-                        except (OSError, IOError, ValueError):
-                            continue
+    if IS_LINUX:
+        # Try multiple variations: original, spaces replaced with hyphens, underscores
+        name_variants = (
+            app_name_lower,
+            app_name_lower.replace(" ", "-"),
+            app_name_lower.replace(" ", "_"),
+        )
+        index = _desktop_index()
+
+        # Exact file-name matches first, then any entry containing the name
+        candidates = [index[name] for name in name_variants if name in index]
+        candidates.extend(
+            path
+            for stem, path in index.items()
+            if any(name in stem for name in name_variants)
+        )
+
+        for desktop_file in dict.fromkeys(candidates):
+            exec_cmd = parse_desktop_file(desktop_file)
+            if exec_cmd and is_command_available(exec_cmd.split()[0]):
+                return exec_cmd
 
     # Check if the app name itself is a valid command
     if is_command_available(app_name_lower):
         return app_name_lower
 
     # Try some common variations
-    variations = [
-        app_name_lower,
-        f"{app_name_lower}-desktop",
-        f"{app_name_lower}.bin",
-        f"{app_name_lower}.sh",
-        f"{app_name_lower}-linux",
-        f"{app_name_lower}-client",
-        f"{app_name_lower}-app",
-        f"{app_name_lower}.AppImage",
-        f"{app_name_lower}-flatpak",
-    ]
-
-    for variation in variations:
+    for suffix in COMMAND_SUFFIXES:
+        variation = app_name_lower + suffix
         if is_command_available(variation):
             return variation
 
     return ""  # Not found
 
 
+@functools.lru_cache(maxsize=1)
+def _existing_desktop_dirs() -> tuple:
+    """
+    Return the DESKTOP_DIRS entries that exist on this system.
+
+    Probed once per process (until refresh_apps() or a failed launch), so
+    directories such as the snapd one on systems without snap cost no stat
+    calls per lookup. Entries that are symlinks to an earlier directory are
+    dropped, so no directory is scanned twice.
+    """
+    existing = {}
+    for desktop_dir in DESKTOP_DIRS:
+        if os.path.isdir(desktop_dir):
+            existing.setdefault(os.path.realpath(desktop_dir), desktop_dir)
+    return tuple(existing.values())
+
+
+@functools.lru_cache(maxsize=1)
+def _desktop_index() -> dict:
+    """
+    Index the .desktop files in DESKTOP_DIRS by lowercase file name.
+
+    Built once on first use, so app lookups become dict probes instead of
+    repeated directory globbing.
+
+    Returns:
+        Mapping of file name without the .desktop suffix to its full path
+    """
+    index = {}
+    for entry in iter_desktop_files(_existing_desktop_dirs()):
+        stem = entry.name[: -len(".desktop")].lower()
+        # Earlier directories take precedence, as before
+        index.setdefault(stem, entry.path)
+    return index
+
+
+# resolve_command() hits, keyed by command name
+_resolved_commands = {}
+
+
+def resolve_command(cmd: str) -> str:
+    """Return the absolute path of a command on PATH (memoized once found).
+
+    Uses a PATH lookup rather than running the command, so probing for
+    e.g. "steam" never actually launches it.
+
+    Returns:
+        Absolute path to the executable, or empty string if not found
+    """
+    path = _resolved_commands.get(cmd)
+    if path is None:
+        path = shutil.which(cmd) or ""
+        if path:
+            _resolved_commands[cmd] = path
+    return path
+
+
 def is_command_available(cmd: str) -> bool:
     """Check if a command is available in PATH."""
-    try:
-        subprocess.run([cmd], capture_output=True, check=False)
-        return True
-    except FileNotFoundError:
-        return False
+    return bool(resolve_command(cmd))
 
 
 def parse_desktop_file(desktop_file: str) -> str:
-    """Parse a .desktop file to extract the Exec command."""
+    """Parse a .desktop file to extract the Exec command.
+
+    Only the [Desktop Entry] group is consulted, so Exec lines belonging to
+    [Desktop Action ...] groups are ignored. The file is read line by line
+    and reading stops at the first matching Exec line.
+    """
+    in_entry = False
     try:
-        with open(desktop_file, "r", encoding="utf-8") as f:
-            content = f.read()
-        for line in content.split("\n"):
-            if line.startswith("Exec="):
-                exec_cmd = line.split("=", 1)[1].strip()
-                # Remove field codes like %f, %F, %u, %U, etc.
-                exec_cmd = exec_cmd.split()[0]  # Take just the command, not args
-                return exec_cmd
-    except (OSError, IOError, UnicodeDecodeError):
-        pass
+        with open(desktop_file, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith("["):
+                    if in_entry:
+                        break  # Left [Desktop Entry] without finding Exec
+                    in_entry = line == "[Desktop Entry]"
+                    continue
+                if not in_entry:
+                    continue
+                key, sep, value = line.partition("=")
+                if sep and key.rstrip() == "Exec":
+                    # Take just the command, dropping args and field codes like %f, %U
+                    exec_cmd = value.split(None, 1)
+                    return exec_cmd[0] if exec_cmd else ""
+    except OSError:
+        return ""
     return ""
 
 
+def _launch(args: list) -> subprocess.Popen:
+    """
+    Start an application detached from Darvis.
+
+    The child gets its own session and no inherited stdio, so it keeps
+    running when Darvis exits and can't block on our terminal.
+
+    Args:
+        args: Command and arguments to run
+
+    Returns:
+        The started process
+    """
+    # Exec the already-resolved path so launching skips another PATH search
+    args = [resolve_command(args[0]) or args[0], *args[1:]]
+    return subprocess.Popen(
+        args,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
 def open_app(app_name: str) -> str:
     """
     Launch applications or open web services based on user commands.
@@ -268,25 +504,18 @@ def open_app(app_name: str) -> str:
         - macOS: Checks /Applications, /System/Applications, ~/Applications
         - Supports common application name variations on both platforms
     """
-    from .config import WEB_SERVICES
-
     app_name_lower = app_name.lower()
 
     # Handle web services that should open in browser
     if app_name_lower in WEB_SERVICES:
-        open_cmd = get_open_command()
+        url = WEB_SERVICES[app_name_lower]
         try:
-            subprocess.Popen([open_cmd, WEB_SERVICES[app_name_lower]])
+            _launch([OPEN_COMMAND, url])
             return f"Opening {app_name}"
         except FileNotFoundError:
-            # Fallback to trying browsers directly
-            browsers = ["chromium", "firefox", "google-chrome", "safari"]
-            for browser in browsers:
-                try:
-                    subprocess.Popen([browser, WEB_SERVICES[app_name_lower]])
-                    return f"Opening {app_name} in {browser}"
-                except FileNotFoundError:
-                    continue
+            # No system opener; webbrowser already knows which browsers exist
+            if webbrowser.open(url):
+                return f"Opening {app_name} in your browser"
             return (
                 f"Couldn't find a way to open {app_name}. "
                 f"Try installing a browser or check if it's in your PATH."
@@ -295,20 +524,24 @@ def open_app(app_name: str) -> str:
             return f"Error opening {app_name}: {str(e)}"
     else:
         # Try to find the app command
-        app_command = find_app_command(app_name)
+        app_command = find_app_command(app_name_lower)
 
         if app_command:
             try:
                 # On macOS, use 'open' command for .app bundles
-                if is_macos() and app_command.endswith('.app'):
-                    subprocess.Popen(["open", app_command])
+                if IS_MACOS and app_command.endswith('.app'):
+                    _launch([OPEN_COMMAND, app_command])
                 else:
-                    subprocess.Popen([app_command])
+                    _launch([app_command])
                 return f"Opening {app_name}"
+            except FileNotFoundError as e:
+                # Uninstalled or moved since it was found; search next time
+                _forget_app_command(app_name_lower, app_command)
+                return f"Error launching {app_name}: {str(e)}"
             except Exception as e:
                 return f"Error launching {app_name}: {str(e)}"
         else:
-            platform_hint = "brew install" if is_macos() else "pacman -S (on Arch)"
+            platform_hint = "brew install" if IS_MACOS else "pacman -S (on Arch)"
             return (
                 f"'{app_name}' is not installed or not found on this system. "
                 f"Try: {platform_hint} {app_name} or check if it's installed."
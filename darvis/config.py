@@ -2,25 +2,39 @@
 Configuration and constants for Darvis Voice Assistant.
 """
 
+import functools
 import os
-import platform
+import re
+import sys
+from enum import Enum
 from pathlib import Path
+from types import MappingProxyType
+from typing import Iterable, Iterator, Optional
+
+# The platform can't change while we run, so detect it once. sys.platform
+# is a preset string, unlike platform.system() which has to call uname.
+IS_LINUX = sys.platform.startswith("linux")
+IS_MACOS = sys.platform == "darwin"
+
+# The user's home directory, looked up once for building per-user paths
+_HOME = os.environ.get("HOME") or os.path.expanduser("~")
 
 # Suppress ALSA warnings for cleaner output (Linux only)
-if platform.system().lower() == "linux":
+if IS_LINUX:
     os.environ["ALSA_LOG_LEVEL"] = "0"
 
 
 def is_linux() -> bool:
     """Check if running on Linux."""
-    return platform.system().lower() == "linux"
+    return IS_LINUX
 
 
 def is_macos() -> bool:
     """Check if running on macOS."""
-    return platform.system().lower() == "darwin"
+    return IS_MACOS
 
 
+@functools.cache
 def get_project_root() -> Path:
     """Get the absolute path to the project root directory.
 
@@ -30,6 +44,7 @@ def get_project_root() -> Path:
     return Path(__file__).parent.parent.resolve()
 
 
+@functools.cache
 def get_waybar_script_path() -> str:
     """Get the path to the waybar status script.
 
@@ -39,17 +54,25 @@ def get_waybar_script_path() -> str:
 
 
 # Wake words for voice activation
-WAKE_WORDS = [
+WAKE_WORDS = (
     "hey darvis",
     "hey jarvis",
     "play darvis",
     "play jarvis",
     "hi darvis",
     "hi jarvis",
-]
+)
+
+# All wake phrases compiled into one alternation, so detection is a single
+# pass over the transcript instead of one substring scan per phrase. Any run
+# of whitespace between words matches, in any letter case.
+WAKE_WORD_PATTERN = re.compile(
+    "|".join(re.escape(word).replace(r"\ ", r"\s+") for word in WAKE_WORDS),
+    re.IGNORECASE,
+)
 
-# Web services mapping
-WEB_SERVICES = {
+# Web services mapping (read-only)
+WEB_SERVICES = MappingProxyType({
     "youtube": "https://youtube.com",
     "google": "https://google.com",
     "gmail": "https://gmail.com",
@@ -71,7 +94,7 @@ WEB_SERVICES = {
     "asana": "https://asana.com",
     "jira": "https://jira.atlassian.com",
     "confluence": "https://confluence.atlassian.com",
-}
+})
 
 # Desktop GUI configuration
 # Set to False to run in headless mode (useful for remote access via web UI only)
@@ -88,47 +111,102 @@ GLOW_DURATION_MS = 1500
 ENERGY_THRESHOLD = 400
 LISTEN_TIMEOUT = 5
 PHRASE_TIME_LIMIT = 5
+# Seconds of trailing silence that end a phrase (speech_recognition default: 0.8)
+PAUSE_THRESHOLD = 0.5
+# Seconds of non-speaking audio kept on both sides of a phrase (must be <= PAUSE_THRESHOLD)
+NON_SPEAKING_DURATION = 0.3
+# Seconds of audio sampled once per microphone to calibrate the energy threshold
+AMBIENT_NOISE_DURATION = 0.5
+# Capture rate for the microphone. 16 kHz is plenty for speech and keeps the
+# FLAC upload to Google a third of the size of a 48 kHz capture.
+MIC_SAMPLE_RATE = 16000
+
+# Offline speech recognition (optional, requires the `vosk` package)
+# Point DARVIS_VOSK_MODEL at an unpacked Vosk model directory to recognize
+# speech on-device instead of sending audio to Google.
+VOSK_MODEL_PATH = os.environ.get("DARVIS_VOSK_MODEL")
+VOSK_SAMPLE_RATE = 16000
+# Retry with Google when Vosk hears nothing; set to "false" to stay offline
+VOSK_CLOUD_FALLBACK = (
+    os.environ.get("DARVIS_VOSK_CLOUD_FALLBACK", "true").lower() == "true"
+)
 
 
 # Application detection settings - platform-specific
-def get_desktop_dirs() -> list:
-    """Get application directories based on platform."""
-    if is_macos():
-        return [
+@functools.cache
+def get_desktop_dirs() -> tuple:
+    """Get application directories based on platform (computed once)."""
+    if IS_MACOS:
+        return (
             "/Applications/",
             "/System/Applications/",
-            os.path.expanduser("~/Applications/"),
-        ]
+            f"{_HOME}/Applications/",
+        )
     else:  # Linux and others
-        return [
+        return (
             "/usr/share/applications/",
             "/usr/local/share/applications/",
-            os.path.expanduser("~/.local/share/applications/"),
+            f"{_HOME}/.local/share/applications/",
             "/var/lib/snapd/desktop/applications/",
-        ]
+        )
+
+
+def iter_desktop_files(dirs: Optional[Iterable[str]] = None) -> Iterator[os.DirEntry]:
+    """Yield the .desktop files in the given directories (default: all).
+
+    Uses os.scandir, so the file-type check comes from the directory
+    listing rather than a stat call per file. Missing or unreadable
+    directories are skipped.
+    """
+    for desktop_dir in get_desktop_dirs() if dirs is None else dirs:
+        try:
+            with os.scandir(desktop_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".desktop") and entry.is_file():
+                        yield entry
+        except OSError:
+            continue
 
 
 # Keep backward compatibility
 DESKTOP_DIRS = get_desktop_dirs()
 
-# Message queue types
-MSG_TYPES = {
-    "INSERT": "insert",
-    "STATUS": "status",
-    "WAKE_WORD_DETECTED": "wake_word_detected",
-    "WAKE_WORD_END": "wake_word_end",
-}
+# App name -> launch command, remembered across runs so repeat launches skip
+# the search. Discarded when PATH changes.
+RESOLVED_APPS_CACHE = Path(_HOME) / ".cache" / "darvis" / "resolved_apps.json"
+
+
+# Message queue types. Members are also plain strings, so they compare and
+# hash equal to their values, and print as them.
+class MsgType(str, Enum):
+    """Types of message posted to the GUI message queue."""
+
+    INSERT = "insert"
+    STATUS = "status"
+    WAKE_WORD_DETECTED = "wake_word_detected"
+    WAKE_WORD_END = "wake_word_end"
 
-# Waybar integration configuration
-# The exec path will be set dynamically at runtime
-WAYBAR_MODULE_CONFIG = {
-    "custom/darvis": {
-        "exec": f"python3 {get_waybar_script_path()}",
-        "return-type": "json",
-        "restart-interval": 0,
-        "tooltip-format": "{tooltip}",
+    def __str__(self):
+        return self.value
+
+
+# Name -> message type, for callers written against the original dict
+MSG_TYPES = MappingProxyType({msg_type.name: msg_type for msg_type in MsgType})
+
+
+# Waybar integration configuration, exposed lazily as WAYBAR_MODULE_CONFIG
+# so importing config doesn't resolve the project path
+def _build_waybar_module_config() -> dict:
+    """Build the Waybar module config for the darvis status script."""
+    return {
+        "custom/darvis": {
+            "exec": f"python3 {get_waybar_script_path()}",
+            "return-type": "json",
+            "restart-interval": 0,
+            "tooltip-format": "{tooltip}",
+        }
     }
-}
+
 
 # Remote access configuration
 # Set DARVIS_MODE=local to restrict to localhost only (default)
@@ -155,7 +233,26 @@ else:
     WEB_APP_HOST = "127.0.0.1"
 
 WEB_APP_PORT = DARVIS_WEB_PORT
-WEB_APP_URL = f"http://{WEB_APP_HOST}:{WEB_APP_PORT}"
+
+# Settings built on first access rather than at import
+_LAZY_SETTINGS = {
+    "WAYBAR_MODULE_CONFIG": _build_waybar_module_config,
+    "WEB_APP_URL": lambda: f"http://{WEB_APP_HOST}:{WEB_APP_PORT}",
+}
+
+
+def __getattr__(name: str):
+    """Build lazy settings on first access and cache them (PEP 562)."""
+    try:
+        factory = _LAZY_SETTINGS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = globals()[name] = factory()
+    return value
+
+
+# Command that opens files/URLs with the desktop's default handler
+OPEN_COMMAND = "open" if IS_MACOS else "xdg-open"
 
 
 def get_open_command() -> str:
@@ -164,9 +261,7 @@ def get_open_command() -> str:
     Returns:
         Command string: 'xdg-open' for Linux, 'open' for macOS
     """
-    if is_macos():
-        return "open"
-    return "xdg-open"
+    return OPEN_COMMAND
 
 
 def get_default_working_directory() -> Path:
@@ -187,55 +282,60 @@ DEFAULT_WORKING_DIR = get_default_working_directory()
 
 # macOS-specific application mappings
 MACOS_APP_MAPPINGS = {
-    "safari": ["/Applications/Safari.app"],
-    "chrome": ["/Applications/Google Chrome.app", "/Applications/Chromium.app"],
-    "firefox": ["/Applications/Firefox.app"],
-    "browser": [
+    "safari": ("/Applications/Safari.app",),
+    "chrome": ("/Applications/Google Chrome.app", "/Applications/Chromium.app"),
+    "firefox": ("/Applications/Firefox.app",),
+    "browser": (
         "/Applications/Safari.app",
         "/Applications/Google Chrome.app",
         "/Applications/Firefox.app",
-    ],
-    "terminal": ["/System/Applications/Terminal.app", "/Applications/iTerm.app"],
-    "editor": ["/Applications/TextEdit.app", "/Applications/CotEditor.app"],
-    "textedit": ["/Applications/TextEdit.app"],
-    "calculator": ["/System/Applications/Calculator.app"],
-    "facetime": ["/System/Applications/FaceTime.app"],
-    "messages": ["/System/Applications/Messages.app"],
-    "mail": ["/System/Applications/Mail.app"],
-    "notes": ["/System/Applications/Notes.app"],
-    "calendar": ["/System/Applications/Calendar.app"],
-    "photos": ["/System/Applications/Photos.app"],
-    "music": ["/System/Applications/Music.app"],
-    "appstore": ["/System/Applications/App Store.app"],
-    "settings": [
+    ),
+    "terminal": ("/System/Applications/Terminal.app", "/Applications/iTerm.app"),
+    "editor": ("/Applications/TextEdit.app", "/Applications/CotEditor.app"),
+    "textedit": ("/Applications/TextEdit.app",),
+    "calculator": ("/System/Applications/Calculator.app",),
+    "facetime": ("/System/Applications/FaceTime.app",),
+    "messages": ("/System/Applications/Messages.app",),
+    "mail": ("/System/Applications/Mail.app",),
+    "notes": ("/System/Applications/Notes.app",),
+    "calendar": ("/System/Applications/Calendar.app",),
+    "photos": ("/System/Applications/Photos.app",),
+    "music": ("/System/Applications/Music.app",),
+    "appstore": ("/System/Applications/App Store.app",),
+    "settings": (
         "/System/Applications/System Settings.app",
         "/System/Applications/System Preferences.app",
-    ],
-    "system preferences": [
+    ),
+    "system preferences": (
         "/System/Applications/System Settings.app",
         "/System/Applications/System Preferences.app",
-    ],
-    "preview": ["/System/Applications/Preview.app"],
-    "activity monitor": ["/System/Applications/Utilities/Activity Monitor.app"],
-    "console": ["/System/Applications/Utilities/Console.app"],
-    "disk utility": ["/System/Applications/Utilities/Disk Utility.app"],
-    "keychain access": ["/System/Applications/Utilities/Keychain Access.app"],
+    ),
+    "preview": ("/System/Applications/Preview.app",),
+    "activity monitor": ("/System/Applications/Utilities/Activity Monitor.app",),
+    "console": ("/System/Applications/Utilities/Console.app",),
+    "disk utility": ("/System/Applications/Utilities/Disk Utility.app",),
+    "keychain access": ("/System/Applications/Utilities/Keychain Access.app",),
     # Development apps
-    "code": ["/Applications/Visual Studio Code.app"],
-    "vscode": ["/Applications/Visual Studio Code.app"],
-    "sublime": ["/Applications/Sublime Text.app"],
-    "xcode": ["/Applications/Xcode.app"],
-    "docker": ["/Applications/Docker.app"],
-    "iterm": ["/Applications/iTerm.app"],
+    "code": ("/Applications/Visual Studio Code.app",),
+    "vscode": ("/Applications/Visual Studio Code.app",),
+    "sublime": ("/Applications/Sublime Text.app",),
+    "xcode": ("/Applications/Xcode.app",),
+    "docker": ("/Applications/Docker.app",),
+    "iterm": ("/Applications/iTerm.app",),
     # Productivity apps
-    "spotify": ["/Applications/Spotify.app"],
-    "slack": ["/Applications/Slack.app"],
-    "discord": ["/Applications/Discord.app"],
-    "zoom": ["/Applications/zoom.us.app"],
-    "teams": ["/Applications/Microsoft Teams.app"],
-    "obsidian": ["/Applications/Obsidian.app"],
-    "notion": ["/Applications/Notion.app"],
-    "figma": ["/Applications/Figma.app"],
-    "postman": ["/Applications/Postman.app"],
-    "insomnia": ["/Applications/Insomnia.app"],
+    "spotify": ("/Applications/Spotify.app",),
+    "slack": ("/Applications/Slack.app",),
+    "discord": ("/Applications/Discord.app",),
+    "zoom": ("/Applications/zoom.us.app",),
+    "teams": ("/Applications/Microsoft Teams.app",),
+    "obsidian": ("/Applications/Obsidian.app",),
+    "notion": ("/Applications/Notion.app",),
+    "figma": ("/Applications/Figma.app",),
+    "postman": ("/Applications/Postman.app",),
+    "insomnia": ("/Applications/Insomnia.app",),
 }
+
+
+def lookup_macos_app(name: str) -> tuple:
+    """Return the candidate .app bundle paths for an app name, if any."""
+    return MACOS_APP_MAPPINGS.get(name.lower(), ())
@@ -2,38 +2,293 @@
 Speech recognition and text-to-speech functionality.
 """
 
+import atexit
+import functools
+import json
+import queue
+import threading
 from typing import Optional
 
 import speech_recognition as sr
 
-from .config import ENERGY_THRESHOLD, LISTEN_TIMEOUT, PHRASE_TIME_LIMIT
+try:
+    import vosk
+
+    HAS_VOSK = True
+except ImportError:
+    HAS_VOSK = False
+
+from .config import (
+    AMBIENT_NOISE_DURATION,
+    ENERGY_THRESHOLD,
+    LISTEN_TIMEOUT,
+    MIC_SAMPLE_RATE,
+    NON_SPEAKING_DURATION,
+    PAUSE_THRESHOLD,
+    PHRASE_TIME_LIMIT,
+    VOSK_CLOUD_FALLBACK,
+    VOSK_MODEL_PATH,
+    VOSK_SAMPLE_RATE,
+    WAKE_WORD_PATTERN,
+)
+
+# Utterances waiting to be spoken by the background TTS worker.
+_tts_queue = queue.Queue()
+_tts_thread = None
+_tts_thread_lock = threading.Lock()
+
+# Lazily-initialized pyttsx3 engine, only ever touched by the TTS worker.
+_tts_engine = None
+
+# Lazily-loaded Vosk model; False once loading has failed so we don't retry.
+_vosk_model = None
+
+# Shared recognizer; keeps its adaptive energy threshold between calls.
+_recognizer = None
+
+# Device indices whose ambient noise level has already been sampled.
+_calibrated_devices = set()
+
+# Open (microphone, source) pairs keyed by device index. Opening a PortAudio
+# stream costs 100ms+ on Linux, so streams stay open across listen() calls
+# until close_microphones() runs (at the latest, at interpreter exit).
+_microphones = {}
+_microphones_lock = threading.Lock()
+
+
+def _speak_now(text: str) -> None:
+    """Speak text synchronously on the calling thread."""
+    global _tts_engine
+    try:
+        if _tts_engine is None:
+            import pyttsx3
+
+            _tts_engine = pyttsx3.init()
+        _tts_engine.say(text)
+        _tts_engine.runAndWait()
+    except Exception:
+        # Silently ignore TTS errors - text feedback is still shown. Drop the
+        # engine so a driver left in a bad state is rebuilt on the next call.
+        _tts_engine = None
+
+
+def _tts_worker() -> None:
+    """Consume queued utterances and speak them one at a time."""
+    while True:
+        text = _tts_queue.get()
+        try:
+            _speak_now(text)
+        finally:
+            _tts_queue.task_done()
 
 
 def speak(text: str) -> None:
     """
     Convert text to speech using pyttsx3 TTS engine.
 
+    Speech is played on a background worker thread, so this returns
+    immediately and the caller can carry on listening or processing.
+
     Args:
         text: The text to speak aloud
 
     Note:
         Silently ignores TTS errors to prevent application interruption.
         Text feedback is still provided through the GUI.
+        The TTS driver is loaded on the first utterance and reused afterwards.
     """
-    try:
-        import pyttsx3
+    global _tts_thread
+    with _tts_thread_lock:
+        if _tts_thread is None or not _tts_thread.is_alive():
+            _tts_thread = threading.Thread(
+                target=_tts_worker, name="darvis-tts", daemon=True
+            )
+            _tts_thread.start()
+    _tts_queue.put(text)
 
-        engine = pyttsx3.init()
-        engine.say(text)
-        engine.runAndWait()
-    except Exception:
-        # Silently ignore TTS errors - text feedback is still shown
+
+def _get_vosk_model():
+    """Return the configured Vosk model, loading it on first use.
+
+    Returns:
+        The loaded model, or None when offline recognition is unavailable.
+    """
+    global _vosk_model
+    if _vosk_model is None:
+        if not (HAS_VOSK and VOSK_MODEL_PATH):
+            return None
+        try:
+            vosk.SetLogLevel(-1)
+            _vosk_model = vosk.Model(VOSK_MODEL_PATH)
+        except Exception as e:
+            print(f"Vosk model load failed, using Google STT: {e}")
+            _vosk_model = False
+    return _vosk_model or None
+
+
+def _recognize(recognizer, audio) -> str:
+    """Transcribe captured audio, on-device when a Vosk model is configured.
+
+    If Vosk can't make out any words, the audio goes to Google instead unless
+    DARVIS_VOSK_CLOUD_FALLBACK is "false".
+    """
+    model = _get_vosk_model()
+    if model is None:
+        return recognizer.recognize_google(audio)
+
+    vosk_recognizer = vosk.KaldiRecognizer(model, VOSK_SAMPLE_RATE)
+    vosk_recognizer.AcceptWaveform(
+        audio.get_raw_data(convert_rate=VOSK_SAMPLE_RATE, convert_width=2)
+    )
+    text = json.loads(vosk_recognizer.FinalResult()).get("text", "")
+    if not text and VOSK_CLOUD_FALLBACK:
+        return recognizer.recognize_google(audio)
+    return text
+
+
+@functools.lru_cache(maxsize=1)
+def get_microphone_names() -> tuple:
+    """Return the names of available audio devices, indexed by device index.
+
+    The PortAudio device enumeration is cached for the life of the process;
+    call refresh_microphones() after plugging in a new device.
+    """
+    return tuple(sr.Microphone.list_microphone_names())
+
+
+def refresh_microphones() -> None:
+    """Forget cached audio devices so they are enumerated again on next use."""
+    get_microphone_names.cache_clear()
+    close_microphones()
+    _calibrated_devices.clear()
+
+
+def close_microphones() -> None:
+    """Close any microphone streams that listen() is holding open."""
+    with _microphones_lock:
+        for device_index in list(_microphones):
+            _close_microphone(device_index)
+
+
+atexit.register(close_microphones)
+
+
+def _get_recognizer():
+    """Return the shared sr.Recognizer, creating it on first use."""
+    global _recognizer
+    if _recognizer is None:
+        r = sr.Recognizer()
+        r.energy_threshold = ENERGY_THRESHOLD
+        r.dynamic_energy_threshold = True
+        # End the phrase sooner after the user stops talking so recognition
+        # starts earlier; the upload can't begin until recording finishes.
+        r.pause_threshold = PAUSE_THRESHOLD
+        r.non_speaking_duration = NON_SPEAKING_DURATION
+        _recognizer = r
+    return _recognizer
+
+
+def _get_source(device_index: Optional[int]):
+    """Return an open audio source for the device, opening it on first use.
+
+    Must be called with _microphones_lock held.
+    """
+    entry = _microphones.get(device_index)
+    if entry is None:
+        try:
+            microphone = sr.Microphone(
+                device_index=device_index, sample_rate=MIC_SAMPLE_RATE
+            )
+            entry = (microphone, microphone.__enter__())
+        except OSError:
+            # Some devices (e.g. ALSA hw: or USB mics) only accept their
+            # native rate; fall back to it, recognition resamples anyway
+            microphone = sr.Microphone(device_index=device_index)
+            entry = (microphone, microphone.__enter__())
+        _microphones[device_index] = entry
+    return entry[1]
+
+
+def _close_microphone(device_index: Optional[int]) -> None:
+    """Close one open microphone stream. Must be called with the lock held."""
+    entry = _microphones.pop(device_index, None)
+    if entry is not None:
+        try:
+            entry[0].__exit__(None, None, None)
+        except Exception:
+            pass
+
+
+def capture(device_index: Optional[int] = None) -> Optional[sr.AudioData]:
+    """
+    Record one phrase from the microphone.
+
+    Args:
+        device_index: Specific microphone device index to use.
+                     If None, uses system default.
+
+    Returns:
+        The captured audio, or None if nobody spoke or the microphone failed.
+    """
+    r = _get_recognizer()
+    try:
+        with _microphones_lock:
+            try:
+                source = _get_source(device_index)
+                # Pause the stream between captures so PortAudio does not
+                # buffer stale audio that the next listen would pick up first
+                stream = source.stream.pyaudio_stream
+                if stream.is_stopped():
+                    stream.start_stream()
+                try:
+                    if device_index not in _calibrated_devices:
+                        r.adjust_for_ambient_noise(
+                            source, duration=AMBIENT_NOISE_DURATION
+                        )
+                        _calibrated_devices.add(device_index)
+                    return r.listen(
+                        source,
+                        timeout=LISTEN_TIMEOUT,
+                        phrase_time_limit=PHRASE_TIME_LIMIT,
+                    )
+                finally:
+                    stream.stop_stream()
+            except OSError:
+                # The stream may be dead (device unplugged); reopen next time
+                _close_microphone(device_index)
+                raise
+    except OSError as e:
+        print(f"Microphone error: {e}")
+    except sr.WaitTimeoutError:
         pass
+    return None
+
+
+def transcribe(audio: sr.AudioData) -> str:
+    """
+    Turn captured audio into text.
+
+    Args:
+        audio: Audio returned by capture()
+
+    Returns:
+        Lowercase transcribed text, or empty string if nothing was recognized.
+    """
+    try:
+        return _recognize(_get_recognizer(), audio).lower()
+    except sr.UnknownValueError:
+        return ""
+    except sr.RequestError as e:
+        print(f"API error: {e}")
+        return ""
 
 
 def listen(device_index: Optional[int] = None) -> str:
     """
-    Capture and transcribe voice input using Google Speech Recognition.
+    Capture and transcribe voice input.
+
+    Uses an on-device Vosk model when DARVIS_VOSK_MODEL is set and the
+    `vosk` package is installed, otherwise Google Speech Recognition.
 
     Args:
         device_index: Specific microphone device index to use.
@@ -49,25 +304,23 @@ def listen(device_index: Optional[int] = None) -> str:
         Manual input is handled separately through the GUI input field.
         This function focuses solely on voice-to-text conversion.
     """
-    r = sr.Recognizer()
-    r.energy_threshold = ENERGY_THRESHOLD
-    try:
-        with sr.Microphone(device_index=device_index) as source:
-            audio = r.listen(
-                source, timeout=LISTEN_TIMEOUT, phrase_time_limit=PHRASE_TIME_LIMIT
-            )
-        try:
-            return r.recognize_google(audio).lower()
-        except sr.UnknownValueError:
-            return ""
-        except sr.RequestError as e:
-            print(f"API error: {e}")
-            return ""
-    except OSError as e:
-        print(f"Microphone error: {e}")
-        return ""
-    except sr.WaitTimeoutError:
+    audio = capture(device_index)
+    if audio is None:
         return ""
+    return transcribe(audio)
+
+
+def contains_wake_word(text: str) -> bool:
+    """
+    Check whether a transcript contains any of the configured wake words.
+
+    Args:
+        text: Transcribed speech, as returned by listen()
+
+    Returns:
+        True if a wake word ("hey darvis", "hi jarvis", ...) was spoken
+    """
+    return WAKE_WORD_PATTERN.search(text) is not None
 
 
 def list_microphones() -> None:
@@ -83,7 +336,7 @@ def list_microphones() -> None:
         Index 1: Another Microphone Name
         ...
     """
-    microphones = sr.Microphone.list_microphone_names()
+    microphones = get_microphone_names()
     print("Available microphones:")
     for i, name in enumerate(microphones):
         print(f"Index {i}: {name}")
@@ -3,14 +3,16 @@ User interface and GUI components for Darvis Voice Assistant.
 """
 
 import atexit
+import collections
 import os
-import queue
+import re
 import signal
 import socket
 import sys
 import time
 import tkinter as tk
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image, ImageTk
 
 try:
@@ -23,12 +25,25 @@ except ImportError:
 from .ai import process_ai_query
 from .speech import speak
 from .waybar_status import init_waybar, update_waybar_status
-from .config import DARVIS_ENABLE_DESKTOP_GUI
+from .config import DARVIS_ENABLE_DESKTOP_GUI, WAKE_WORDS, MsgType
 
 
 # Global flag for graceful shutdown
 _shutdown_requested = False
 
+# Single worker for AI queries: they run off the Tk thread, one at a time,
+# since each continues the same CLI conversation
+_ai_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="darvis-ai")
+
+# End of a sentence in streamed AI output; finished sentences are spoken
+# while the rest of the response is still being generated
+_SENTENCE_END = re.compile(r"[.!?](?=\s)")
+
+# Virtual event used to wake the GUI thread when a message is queued
+MESSAGE_EVENT = "<<DarvisMessage>>"
+# Safety poll (ms) for messages queued before the event loop was running
+MESSAGE_POLL_INTERVAL = 500
+
 
 class GUIPrinter:
     """Custom stdout writer that also logs to GUI."""
@@ -72,9 +87,6 @@ def _handle_sigterm(signum, frame):
     os._exit(0)  # Force exit without cleanup
 
 
-signal.signal(signal.SIGTERM, _handle_sigterm)
-
-
 class DarvisGUI:
     """Main GUI class for the Darvis Voice Assistant."""
 
@@ -92,7 +104,9 @@ class DarvisGUI:
         print("✅ Tkinter window created")
 
         # Initialize variables
-        self.msg_queue = queue.Queue()
+        # deque append/popleft are atomic, so producers need no extra locking
+        self.msg_queue = collections.deque()
+        self._drain_pending = False
         self.manual_input_entry = None
         self.text_info = None
         self.logo_label = None
@@ -107,16 +121,14 @@ class DarvisGUI:
         self.wake_glow_image = None
         self.ai_glow_image = None
         self.current_logo_state = "normal"
+        self._glow_reset_job = None  # pending root.after id for glow off
+        # Streamed AI reply state; only touched on the Tk thread
+        self._ai_stream_started = False
+        self._ai_stream_ends_line = False  # last chunk ended with a newline
+        self._ai_unspoken = ""
 
         # Voice and AI variables
-        self.wake_words = [
-            "hey darvis",
-            "hey jarvis",
-            "play darvis",
-            "play jarvis",
-            "hi darvis",
-            "hi jarvis",
-        ]
+        self.wake_words = WAKE_WORDS
         self.ai_mode = tk.BooleanVar()
         self.listening_mode = tk.BooleanVar(value=False)  # Default to OFF
         self.conversation_history = []
@@ -466,27 +478,81 @@ class DarvisGUI:
         pass
 
     def start_message_processing(self):
-        """Start message processing."""
-        pass
+        """Start draining messages posted by background threads."""
+        self.root.bind(MESSAGE_EVENT, lambda event: self._schedule_drain())
+        self._poll_messages()
+
+    def _poll_messages(self):
+        """Safety poll in case a wake-up event was missed."""
+        self._process_messages()
+        self.root.after(MESSAGE_POLL_INTERVAL, self._poll_messages)
+
+    def _post_message(self, msg_type, text="", tag=None):
+        """Queue a message for the GUI thread and wake it up.
+
+        Safe to call from any thread.
+
+        Args:
+            msg_type: A MsgType member
+            text: Message text
+            tag: Optional text widget color tag
+        """
+        self.msg_queue.append({"type": msg_type, "text": text, "tag": tag})
+        try:
+            self.root.event_generate(MESSAGE_EVENT, when="tail")
+        except (tk.TclError, RuntimeError):
+            # Event loop not running yet; the safety poll will pick it up
+            pass
+
+    def _schedule_drain(self):
+        """Drain the queue once Tk is idle, coalescing a burst of wake-ups."""
+        if not self._drain_pending:
+            self._drain_pending = True
+            self.root.after_idle(self._process_messages)
+
+    def _process_messages(self):
+        """Drain every pending message from the queue.
+
+        Text inserts are written to the chat with a single widget update
+        and scroll, rather than one per message.
+        """
+        self._drain_pending = False
+        pending = []
+        while True:
+            try:
+                msg = self.msg_queue.popleft()
+            except IndexError:
+                break
 
-    def display_message(self, message):
-        """Display a message in the GUI."""
+            if msg["type"] == MsgType.INSERT:
+                pending.append((msg["text"], msg.get("tag")))
+
+        self._insert_batch(pending)
+
+    def _insert_batch(self, segments):
+        """Append (text, tag) segments to the chat in one insert call."""
+        if not segments or not self.text_info:
+            return
+        args = []
+        for text, tag in segments:
+            args.extend((text, tag or ()))
+        self.text_info.config(state=tk.NORMAL)
+        self.text_info.insert(tk.END, *args)
+        self.text_info.config(state=tk.DISABLED)
+        self.text_info.see(tk.END)
+
+    def display_message(self, message, tag=None):
+        """Display a message in the GUI with an optional color tag."""
         if self.text_info:
             self.text_info.config(state=tk.NORMAL)
 
-            # Apply color tags for entire You: and AI: messages
-            if message.startswith("You:"):
-                self.text_info.insert(tk.END, message, "you")
-            elif message.startswith("AI:"):
-                self.text_info.insert(tk.END, message, "ai")
+            # Callers pass the color tag ("you", "ai", ...) for their message
+            if tag:
+                self.text_info.insert(tk.END, message, tag)
             else:
                 self.text_info.insert(tk.END, message)
 
             self.text_info.config(state=tk.DISABLED)
-
-            # Ensure auto-scroll happens after widget updates
-            if self.text_info:
-                self.root.after(10, lambda: self.text_info.see(tk.END))
             self.text_info.see(tk.END)
 
     def copy_chat(self):
@@ -509,6 +575,10 @@ class DarvisGUI:
         """Add or remove glow effect from logo by switching images (like master branch)."""
         print(f"🔥 glow_logo called: enable_glow={enable_glow}, ai_active={ai_active}")
 
+        # A new glow supersedes any pending reset from an earlier response
+        if enable_glow:
+            self._cancel_glow_reset()
+
         if not self.logo_label:
             print("❌ No logo label, returning")
             return
@@ -569,14 +639,23 @@ class DarvisGUI:
         glow_radius = 10  # Even larger glow radius for better visibility
         max_alpha = 255  # Maximum brightness
 
-        # Apply intense glow to eye regions with larger radius
-        for x in range(width):
-            for y in range(height):
-                for eye_region in eye_regions:
-                    ex1, ey1, ex2, ey2 = eye_region
-                    eye_center_x = (ex1 + ex2) // 2
-                    eye_center_y = (ey1 + ey2) // 2
+        # Apply intense glow to eye regions with larger radius. Only pixels
+        # within glow_radius of an eye center change, so visit just those.
+        for eye_region in eye_regions:
+            ex1, ey1, ex2, ey2 = eye_region
+            eye_center_x = (ex1 + ex2) // 2
+            eye_center_y = (ey1 + ey2) // 2
+            x_range = range(
+                max(0, eye_center_x - glow_radius),
+                min(width, eye_center_x + glow_radius + 1),
+            )
+            y_range = range(
+                max(0, eye_center_y - glow_radius),
+                min(height, eye_center_y + glow_radius + 1),
+            )
 
+            for x in x_range:
+                for y in y_range:
                     # Calculate distance from eye center
                     distance = (
                         (x - eye_center_x) ** 2 + (y - eye_center_y) ** 2
@@ -620,7 +699,7 @@ class DarvisGUI:
             input_text = self.manual_input_entry.get().strip()
             if input_text:
                 # Display the message locally
-                self.display_message(f"You: {input_text}\n")
+                self.display_message(f"You: {input_text}\n", "you")
 
                 # Clear the input
                 self.manual_input_entry.delete(0, tk.END)
@@ -637,11 +716,7 @@ class DarvisGUI:
                 else:
                     print("🚀 Starting local AI processing with glow")
                     self.glow_logo(True, True)  # Red glow for AI processing
-                    threading.Thread(
-                        target=self._process_ai_query_threaded,
-                        args=(input_text,),
-                        daemon=True,
-                    ).start()
+                    _ai_executor.submit(self._process_ai_query_threaded, input_text)
 
     def _process_ai_query_threaded(self, query):
         """Process AI query in background thread."""
@@ -650,44 +725,120 @@ class DarvisGUI:
             # Update waybar status to thinking
             update_waybar_status("thinking", f"Thinking about: {query[:30]}...")
 
-            response, session_id = process_ai_query(query)
+            # Reset on the Tk thread so it is ordered after any callbacks
+            # still pending from the previous query
+            self.root.after(0, self._reset_ai_stream)
+            response, session_id = process_ai_query(
+                query,
+                on_chunk=lambda chunk: self.root.after(
+                    0, self._display_ai_chunk, chunk
+                ),
+            )
 
             print(f"✅ AI response received: {response[:50]}...")
             # Update waybar status to success
             update_waybar_status("success", "Response delivered")
 
-            # Update UI on main thread
-            self.root.after(0, lambda: self._display_ai_response(response))
+            # Update UI on main thread; an empty session marker means the
+            # query failed and response holds the error message
+            failed = not session_id
+            self.root.after(
+                0, lambda: self._display_ai_response(response, failed=failed)
+            )
 
         except Exception as e:
             print(f"❌ AI processing failed: {e}")
             # Update waybar status to error
             update_waybar_status("error", f"AI error: {str(e)[:50]}")
             self.root.after(
-                0, lambda: self._display_ai_response(f"Error processing query: {e}")
+                0,
+                lambda: self._display_ai_response(
+                    f"Error processing query: {e}", failed=True
+                ),
             )
 
-    def _display_ai_response(self, response):
-        """Display AI response and stop glow effect."""
+    def _reset_ai_stream(self):
+        """Forget any streamed state before a new AI reply starts."""
+        self._ai_stream_started = False
+        self._ai_stream_ends_line = False
+        self._ai_unspoken = ""
+
+    def _display_ai_chunk(self, chunk):
+        """Append a partial AI response as the CLI streams it."""
+        if not self._ai_stream_started:
+            self._ai_stream_started = True
+            self.display_message("AI: ", "ai")
+        self.display_message(chunk, "ai")
+        if chunk:
+            self._ai_stream_ends_line = chunk.endswith("\n")
+
+        # Hand finished sentences to TTS now rather than after the whole reply
+        self._ai_unspoken += chunk
+        last_end = None
+        for last_end in _SENTENCE_END.finditer(self._ai_unspoken):
+            pass
+        if last_end:
+            speak(self._ai_unspoken[: last_end.end()].strip())
+            self._ai_unspoken = self._ai_unspoken[last_end.end() :]
+
+    def _display_ai_response(self, response, failed=False):
+        """Display AI response and stop glow effect.
+
+        When failed is True, response is an error message and is shown even if
+        part of the reply was already streamed in.
+        """
         print(f"🤖 AI response received: {response[:50]}...")
-        # Replace the "Processing..." message with the actual response
-        # This is a simple approach - in a real app you'd track the processing message
+        streamed = self._ai_stream_started
         if not getattr(self, "web_sync_enabled", False):
-            self.display_message(f"AI: {response}\n")
+            if streamed:
+                # The response was already streamed in chunk by chunk
+                self._ai_stream_started = False
+                # response is stripped, so check what was actually shown
+                if not self._ai_stream_ends_line:
+                    self.display_message("\n")
+                if failed:
+                    self.display_message(f"AI: {response}\n", "ai")
+            else:
+                self.display_message(f"AI: {response}\n", "ai")
             self.display_message("─" * 50 + "\n")
         else:
             self.send_to_web(f"AI: {response}")
 
-        # Update waybar status to speaking and speak the response
+        # Update waybar status to speaking and speak the response. When it was
+        # streamed, earlier sentences are already queued for speech.
         try:
             update_waybar_status("speaking", "Speaking response...")
-            speak(response)  # Speak the actual response
+            if streamed:
+                remainder = self._ai_unspoken.strip()
+                self._ai_unspoken = ""
+                if remainder:
+                    speak(remainder)
+                if failed:
+                    speak(response)
+            else:
+                speak(response)  # Speak the actual response
         except Exception as e:
             print(f"Speech failed: {e}")
 
         # Stop the glow after a longer delay to ensure it's visible
         print("⏰ Scheduling glow stop in 3 seconds")
-        self.root.after(3000, lambda: self.glow_logo(False, False))
+        self._schedule_glow_reset(3000)
+
+    def _schedule_glow_reset(self, delay):
+        """Turn the glow off after delay ms, replacing any pending reset."""
+        self._cancel_glow_reset()
+        self._glow_reset_job = self.root.after(delay, self._on_glow_reset)
+
+    def _cancel_glow_reset(self):
+        """Cancel a pending glow reset, if any."""
+        if self._glow_reset_job is not None:
+            self.root.after_cancel(self._glow_reset_job)
+            self._glow_reset_job = None
+
+    def _on_glow_reset(self):
+        """Scheduled glow reset callback."""
+        self._glow_reset_job = None
+        self.glow_logo(False, False)
 
     def run(self):
         """Run the GUI main loop."""
@@ -766,26 +917,25 @@ class DarvisGUI:
                 if self.web_connected:
                     print(f"📱 Web message received: {data['message'][:50]}...")
                     # Add to desktop chat with yellow color
-                    self.text_info.config(state=tk.NORMAL)
-                    self.text_info.insert(
-                        tk.END, f"You: {data['message']}\n", "web_user"
+                    self._post_message(
+                        MsgType.INSERT, f"You: {data['message']}\n", "web_user"
                     )
-                    self.text_info.config(state=tk.DISABLED)
-                    self.text_info.see(tk.END)
 
             def on_ai_message(data):
                 # Received AI response from web interface
                 if self.web_connected:
                     print(f"🤖 Web AI response: {data['message'][:50]}...")
                     # Add to desktop chat
-                    self.display_message(f"AI: {data['message']}\n")
+                    self._post_message(
+                        MsgType.INSERT, f"AI: {data['message']}\n", "ai"
+                    )
                     # Dynamic separator based on text widget width
                     width = (
                         int(self.text_info.cget("width") or 80)
                         if self.text_info
                         else 80
                     )
-                    self.display_message("─" * width + "\n")
+                    self._post_message(MsgType.INSERT, "─" * width + "\n")
 
             # Register event handlers BEFORE connecting
             self.web_socket.on("connect", on_connect)
@@ -886,109 +1036,10 @@ class DarvisGUI:
         print("🪟 Calling os._exit(0)", flush=True)
         os._exit(0)
 
-    def _force_cleanup(self):
-        """Force cleanup called from SIGTERM handler."""
-        print("🪟 _force_cleanup() called", flush=True)
-        # Schedule on main thread
-        self.root.after(0, self._do_quit)
-
-    def _do_quit(self):
-        """Actual quit logic."""
-
-        # Set a flag to prevent re-entrance
-        if getattr(self, "_exiting", False):
-            print("🪟 Already exiting, ignoring", flush=True)
-            return
-        self._exiting = True
-
-        # Run the actual cleanup
-        self._do_cleanup()
-
-    def _do_cleanup(self):
-        """Actual cleanup logic shared by quit_app and _force_cleanup."""
-
-        # Send exit status to waybar
-        try:
-            update_waybar_status("idle", "Darvis: Exited")
-        except Exception as e:
-            print(f"Waybar status update failed on exit: {e}")
-
-        # Disconnect from web app
-        if self.web_socket:
-            try:
-                print("🪟 Disconnecting from web app...", flush=True)
-                self.web_socket.disconnect()
-                print("🪟 Web socket disconnected", flush=True)
-            except Exception as e:
-                print(f"🪟 Web socket disconnect error: {e}", flush=True)
-
-        # Perform cleanup of waybar resources
-        try:
-            from .waybar_status import get_waybar_manager
-
-            manager = get_waybar_manager()
-            if manager._initialized:
-                manager.cleanup()
-        except Exception as e:
-            print(f"🪟 Waybar cleanup error: {e}", flush=True)
-
-        if self.tray_icon:
-            try:
-                self.tray_icon.stop()
-            except Exception:
-                pass
-
-        # Kill the web chat server process
-        import subprocess
-
-        try:
-            print("🪟 Killing web_chat.py process...", flush=True)
-            subprocess.run(["pkill", "-f", "web_chat.py"], check=False)
-        except Exception as e:
-            print(f"🪟 Error killing web_chat process: {e}", flush=True)
-
-        # Force kill any child processes before destroying window
-        import os
-        import signal
-
-        try:
-            # Kill any child processes we spawned
-            subprocess.run(["pkill", "-f", "darvis"], check=False)
-        except Exception as e:
-            print(f"🪟 Error killing child processes: {e}", flush=True)
-
-        # Kill the web chat server process
-        try:
-            subprocess.run(["pkill", "-f", "web_chat.py"], check=False)
-            print("🪟 Killed web_chat.py process", flush=True)
-        except Exception as e:
-            print(f"🪟 Error killing web_chat.py: {e}", flush=True)
-
-        print("🪟 Calling root.quit() and root.destroy()", flush=True)
-        try:
-            self.root.quit()
-        except Exception as e:
-            print(f"🪟 root.quit() error: {e}", flush=True)
-        try:
-            self.root.destroy()
-        except Exception as e:
-            print(f"🪟 root.destroy() error: {e}", flush=True)
-        print("🪟 root.quit() returned", flush=True)
-
-        # Restore stdout before exit
-        sys.stdout = self._gui_printer.original_stdout
-
-        # Force exit - os._exit is more aggressive and guaranteed to terminate
-        print("🪟 Calling os._exit(0)", flush=True)
-        os._exit(0)
-
 
 # Global GUI instance for backward compatibility
 _gui_instance = None
 
-# Global PhotoImage reference to prevent garbage collection
-_global_logo_photo = None
-
 
 def init_gui():
     """Initialize the GUI instance."""
@@ -1011,6 +1062,10 @@ def main():
 
     # Conditionally enable desktop GUI
     if DARVIS_ENABLE_DESKTOP_GUI:
+        # Registered here rather than at import so importing darvis.ui has no
+        # side effects
+        signal.signal(signal.SIGTERM, _handle_sigterm)
+
         # For now, just run the GUI - voice processing is handled differently
         # This allows the desktop launcher to work
         gui = DarvisGUI()
@@ -2,136 +2,176 @@
 Unit tests for the AI integration module.
 """
 
+import os
 import pytest
 import subprocess
 from unittest.mock import patch, MagicMock, Mock
 from darvis.ai import (
     process_ai_query,
-    get_latest_session_id,
     cancel_ai_request,
     reset_ai_session,
     is_ai_command,
-    current_ai_process,
-    current_session_id
+    get_available_ollama_models,
+    set_ai_backend,
 )
 
 
 class TestAI:
     """Test cases for AI functionality."""
 
-    @patch('subprocess.run')
-    def test_get_latest_session_id_success(self, mock_subprocess):
-        """Test successful retrieval of latest session ID."""
-        mock_result = MagicMock()
-        mock_result.returncode = 0
-        mock_result.stdout = "SESSION_ID    STATUS    CREATED\n─────────────────────────────────\nabc123def   Active    2023-01-01"
-        mock_subprocess.return_value = mock_result
-
-        result = get_latest_session_id()
-
-        assert result == "abc123def"
-        mock_subprocess.assert_called_once_with(
-            ["opencode", "session", "list"], capture_output=True, text=True, timeout=10
-        )
-
-    @patch('subprocess.run')
-    def test_get_latest_session_id_empty_output(self, mock_subprocess):
-        """Test handling of empty session list output."""
-        mock_result = MagicMock()
-        mock_result.returncode = 0
-        mock_result.stdout = ""
-        mock_subprocess.return_value = mock_result
-
-        result = get_latest_session_id()
-
-        assert result == ""
-
-    @patch('subprocess.run')
-    def test_get_latest_session_id_exception(self, mock_subprocess):
-        """Test handling of subprocess exception."""
-        mock_subprocess.side_effect = Exception("Subprocess error")
-
-        result = get_latest_session_id()
-
-        assert result == ""
+    def setup_method(self):
+        self._pipe_ends = []
+
+    def teardown_method(self):
+        for end in self._pipe_ends:
+            if isinstance(end, int):
+                os.close(end)
+            else:
+                end.close()
+
+    def _pipe(self, data="", close=True):
+        """Return the read end of a real pipe pre-filled with data.
+
+        Both ends are closed in teardown_method unless closed earlier.
+        """
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, data.encode())
+        if close:
+            os.close(write_fd)
+        else:
+            self._pipe_ends.append(write_fd)
+        read_end = open(read_fd, "rb", buffering=0)
+        self._pipe_ends.append(read_end)
+        return read_end, write_fd
+
+    def _mock_process(self, stdout_lines, returncode=0, stderr=""):
+        """Build a Popen stand-in whose pipes already hold the given output."""
+        mock_process = MagicMock()
+        mock_process.stdout, _ = self._pipe("".join(stdout_lines))
+        mock_process.stderr, _ = self._pipe(stderr)
+        mock_process.returncode = returncode
+        return mock_process
 
     @patch('subprocess.Popen')
-    @patch('darvis.ai.get_latest_session_id')
-    def test_process_ai_query_first_query(self, mock_get_session, mock_popen):
+    def test_process_ai_query_first_query(self, mock_popen):
         """Test AI query processing for first query (new session)."""
-        mock_process = MagicMock()
-        mock_process.communicate.return_value = ("Test response", "")
-        mock_process.returncode = 0
-        mock_popen.return_value = mock_process
-        mock_get_session.return_value = "session123"
+        mock_popen.return_value = self._mock_process(["Test response\n"])
 
         # Reset global state for test
         import darvis.ai
-        darvis.ai.current_session_id = None
-        darvis.ai.current_ai_process = None
+        darvis.ai.session.history = []
+        darvis.ai.session.process = None
+        darvis.ai.session.backend = "claude"
 
-        response, session_id = process_ai_query("test query")
+        response, session_marker = process_ai_query("test query")
 
         assert response == "Test response"
-        assert session_id == "session123"
+        assert session_marker == "claude"
         mock_popen.assert_called_once()
-        # Verify the command includes the darvis agent
         args = mock_popen.call_args[0][0]
-        assert "--agent" in args
-        assert "darvis" in args
+        assert args[0] == "claude"
+        assert "-c" not in args
+        assert args[-1] == "test query"
 
     @patch('subprocess.Popen')
     def test_process_ai_query_continuation(self, mock_popen):
         """Test AI query processing for continuation query."""
-        mock_process = MagicMock()
-        mock_process.communicate.return_value = ("Continuation response", "")
-        mock_process.returncode = 0
-        mock_popen.return_value = mock_process
+        mock_popen.return_value = self._mock_process(["Continuation response\n"])
 
         # Set up global state for continuation
         import darvis.ai
-        darvis.ai.current_session_id = "existing_session"
-        darvis.ai.current_ai_process = None
+        darvis.ai.session.history = ["earlier query"]
+        darvis.ai.session.process = None
+        darvis.ai.session.backend = "claude"
 
-        response, session_id = process_ai_query("continuation query")
+        response, session_marker = process_ai_query("continuation query")
 
         assert response == "Continuation response"
-        assert session_id == "existing_session"
-        mock_popen.assert_called_once()
-        # Verify the command uses --continue for continuation
+        assert session_marker == "claude"
+        # Verify the command uses -c to continue the conversation
         args = mock_popen.call_args[0][0]
-        assert "--continue" in args
+        assert "-c" in args
 
+    @patch('subprocess.Popen')
+    def test_process_ai_query_ollama_backend(self, mock_popen):
+        """Test the selected Ollama model is used once the backend is switched."""
+        mock_popen.return_value = self._mock_process(["Ollama response\n"])
+
+        import darvis.ai
+        darvis.ai.session.history = []
+        darvis.ai.session.process = None
+        set_ai_backend("ollama", "llama3:8b")
+        try:
+            response, session_marker = process_ai_query("test query")
+        finally:
+            set_ai_backend("claude")
+
+        assert response == "Ollama response"
+        assert session_marker == "ollama"
+        args = mock_popen.call_args[0][0]
+        assert args[:5] == ["ollama", "launch", "claude", "--model", "llama3:8b"]
+
+    @patch('subprocess.Popen')
+    def test_process_ai_query_streams_chunks(self, mock_popen):
+        """Test partial output is handed to the callback as it arrives."""
+        mock_popen.return_value = self._mock_process(["Line one\n", "Line two\n"])
+
+        import darvis.ai
+        darvis.ai.session.history = []
+        darvis.ai.session.process = None
+
+        chunks = []
+        response, _ = process_ai_query("test query", on_chunk=chunks.append)
+
+        assert "".join(chunks) == "Line one\nLine two\n"
+        assert response == "Line one\nLine two"
+
+    @patch('darvis.ai.AI_TIMEOUT', 0.05)
     @patch('subprocess.Popen')
     def test_process_ai_query_timeout(self, mock_popen):
         """Test AI query processing with timeout."""
         mock_process = MagicMock()
-        mock_process.communicate.side_effect = subprocess.TimeoutExpired(cmd=["test"], timeout=1)
+        # Keep stdout open so the CLI looks hung
+        mock_process.stdout, _ = self._pipe("partial\n", close=False)
+        mock_process.stderr, _ = self._pipe()
         mock_popen.return_value = mock_process
 
         # Reset global state for test
         import darvis.ai
-        darvis.ai.current_session_id = None
-        darvis.ai.current_ai_process = None
+        darvis.ai.session.history = []
+        darvis.ai.session.process = None
 
-        response, session_id = process_ai_query("test query")
+        response, session_marker = process_ai_query("test query")
 
         assert response == "AI query timed out"
-        assert session_id == ""
+        assert session_marker == ""
+        mock_process.kill.assert_called_once()
+        assert mock_process.stdout.closed and mock_process.stderr.closed
+
+    @patch('subprocess.Popen')
+    def test_process_ai_query_closes_pipes(self, mock_popen):
+        """Test the CLI's pipes are closed once its output has been read."""
+        mock_process = self._mock_process(["Test response\n"])
+        mock_popen.return_value = mock_process
+
+        process_ai_query("test query")
+
+        assert mock_process.stdout.closed and mock_process.stderr.closed
 
     @patch('subprocess.Popen')
     def test_process_ai_query_file_not_found(self, mock_popen):
-        """Test AI query processing when opencode is not found."""
+        """Test AI query processing when the claude CLI is not found."""
         mock_popen.side_effect = FileNotFoundError()
 
         # Reset global state for test
         import darvis.ai
-        darvis.ai.current_session_id = None
-        darvis.ai.current_ai_process = None
+        darvis.ai.session.history = []
+        darvis.ai.session.process = None
+        darvis.ai.session.backend = "claude"
 
         response, session_id = process_ai_query("test query")
 
-        assert response == "AI assistance not available (opencode not found)"
+        assert response == "AI assistance not available (claude not found)"
         assert session_id == ""
 
     @patch('subprocess.Popen')
@@ -141,23 +181,24 @@ class TestAI:
 
         # Reset global state for test
         import darvis.ai
-        darvis.ai.current_session_id = None
-        darvis.ai.current_ai_process = None
+        darvis.ai.session.history = []
+        darvis.ai.session.process = None
 
         response, session_id = process_ai_query("test query")
 
         assert "AI error:" in response
         assert session_id == ""
 
-    @patch('darvis.ai.current_ai_process', None)
+    @patch('darvis.ai.session.process', None)
     def test_cancel_ai_request_no_process(self):
         """Test canceling AI request when no process is running."""
         result = cancel_ai_request()
 
         assert result is False
 
-    @patch('darvis.ai.current_ai_process')
-    def test_cancel_ai_request_with_process(self, mock_process):
+    @patch('darvis.ai.os.pidfd_open', side_effect=OSError, create=True)
+    @patch('darvis.ai.session.process')
+    def test_cancel_ai_request_with_process(self, mock_process, mock_pidfd_open):
         """Test canceling AI request when process is running."""
         mock_process.poll.return_value = None  # Process is still running
         mock_process.terminate = MagicMock()
@@ -168,8 +209,9 @@ class TestAI:
         assert result is True
         mock_process.terminate.assert_called_once()
 
-    @patch('darvis.ai.current_ai_process')
-    def test_cancel_ai_request_kill_if_needed(self, mock_process):
+    @patch('darvis.ai.os.pidfd_open', side_effect=OSError, create=True)
+    @patch('darvis.ai.session.process')
+    def test_cancel_ai_request_kill_if_needed(self, mock_process, mock_pidfd_open):
         """Test killing AI process if it doesn't terminate gracefully."""
         mock_process.poll.return_value = None  # Process is still running
         mock_process.terminate = MagicMock()
@@ -184,24 +226,33 @@ class TestAI:
         mock_process.terminate.assert_called_once()
         mock_process.kill.assert_called_once()
 
+    @pytest.mark.skipif(not hasattr(os, "pidfd_open"), reason="needs pidfd support")
+    def test_cancel_ai_request_waits_on_pidfd(self):
+        """Test a real child is terminated and reaped via its pidfd."""
+        import darvis.ai
+        process = subprocess.Popen(["sleep", "30"])
+        darvis.ai.session.process = process
+
+        assert cancel_ai_request() is True
+        assert process.returncode is not None
+        assert darvis.ai.session.process is None
+
     def test_reset_ai_session(self):
         """Test resetting AI session."""
         import darvis.ai
         
         # Set up some state
-        darvis.ai.current_session_id = "test_session"
-        darvis.ai.conversation_history = ["test"]
+        darvis.ai.session.history = ["test"]
         
         reset_ai_session()
         
-        assert darvis.ai.current_session_id is None
-        assert darvis.ai.conversation_history == []
+        assert darvis.ai.session.history == []
 
     @patch('darvis.ai.cancel_ai_request')
     def test_reset_ai_session_with_active_request(self, mock_cancel):
         """Test resetting AI session when there's an active request."""
         import darvis.ai
-        darvis.ai.current_ai_process = MagicMock()
+        darvis.ai.session.process = MagicMock()
         
         mock_cancel.return_value = True
         
@@ -249,4 +300,23 @@ class TestAI:
         """Test AI command detection with mixed case."""
         assert is_ai_command("WHAT is this?") is True
         assert is_ai_command("EXPLAIN this concept") is True
-        assert is_ai_command("Tell me something") is True
\ No newline at end of file
+        assert is_ai_command("Tell me something") is True
+
+    @patch('darvis.ai.resolve_command', return_value="/usr/bin/ollama")
+    @patch('subprocess.run')
+    def test_get_available_ollama_models(self, mock_run, mock_resolve):
+        """Test models are parsed from `ollama ls` run by absolute path."""
+        mock_run.return_value = MagicMock(
+            returncode=0,
+            stdout="NAME          ID    SIZE\nllama3:8b     abc   4.7 GB\nqwen2:7b      def   4.4 GB\n",
+        )
+
+        assert get_available_ollama_models() == ["llama3:8b", "qwen2:7b"]
+        assert mock_run.call_args[0][0] == ["/usr/bin/ollama", "ls"]
+
+    @patch('darvis.ai.resolve_command', return_value="")
+    @patch('subprocess.run')
+    def test_get_available_ollama_models_not_installed(self, mock_run, mock_resolve):
+        """Test no subprocess is started when ollama isn't installed."""
+        assert get_available_ollama_models() == []
+        mock_run.assert_not_called()
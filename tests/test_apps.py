@@ -2,13 +2,41 @@
 Unit tests for the application detection module.
 """
 
+import os
+import subprocess
+
 import pytest
-from unittest.mock import patch, mock_open, MagicMock
+from unittest.mock import patch, mock_open
 from darvis.apps import (
-    find_app_command, is_command_available, parse_desktop_file, open_app
+    find_app_command, is_command_available, parse_desktop_file, open_app,
+    clear_app_command_cache, refresh_apps
+)
+
+# Keyword arguments every app launch is expected to use
+DETACHED = dict(
+    stdin=subprocess.DEVNULL,
+    stdout=subprocess.DEVNULL,
+    stderr=subprocess.DEVNULL,
+    start_new_session=True,
 )
 
 
+@pytest.fixture(autouse=True)
+def clear_app_caches(tmp_path):
+    """Reset memoized lookups so patched helpers are actually consulted."""
+    with patch('darvis.apps.RESOLVED_APPS_CACHE', tmp_path / "resolved_apps.json"):
+        refresh_apps()
+        yield
+        refresh_apps()
+
+
+@pytest.fixture
+def bare_command_names():
+    """Launch commands by name, whatever this machine has on PATH."""
+    with patch('darvis.apps.resolve_command', return_value=""):
+        yield
+
+
 class TestApps:
     """Test cases for application detection and launching."""
 
@@ -32,37 +60,187 @@ class TestApps:
         assert result == "chromium"
 
     @patch('darvis.apps.is_command_available')
-    @patch('builtins.open', new_callable=mock_open)
-    @patch('glob.glob')
-    def test_find_app_command_desktop_file(self, mock_glob, mock_file, mock_is_available):
-        """Test finding app via desktop file parsing."""
-        mock_glob.return_value = ["/usr/share/applications/test.desktop"]
-        mock_file.return_value.read.return_value = "[Desktop Entry]\nExec=firefox %u\n"
+    def test_find_app_command_memoized_case_insensitively(self, mock_is_available):
+        """Test repeat lookups, in any case, are served from the cache."""
         mock_is_available.return_value = True
 
-        result = find_app_command("firefox")
+        assert find_app_command("Firefox") == "firefox"
+        assert find_app_command("firefox") == "firefox"
+        assert mock_is_available.call_count == 1
+
+        clear_app_command_cache()
+        find_app_command("firefox")
+        assert mock_is_available.call_count == 2
+
+    @patch('darvis.apps._search_app_command', return_value="firefox")
+    @patch('darvis.apps.is_command_available', return_value=True)
+    def test_find_app_command_reuses_saved_result(self, mock_is_available, mock_search):
+        """Test a command found in an earlier run is reused without searching."""
+        import darvis.apps
+
+        assert find_app_command("browser") == "firefox"
+        # Simulate a new process: in-memory caches are empty, the file remains
+        clear_app_command_cache()
+        darvis.apps._resolved_apps = None
+
+        assert find_app_command("browser") == "firefox"
+        mock_search.assert_called_once()
+
+    @patch('darvis.apps._search_app_command', return_value="firefox")
+    @patch('darvis.apps.is_command_available', return_value=True)
+    def test_find_app_command_saved_result_dropped_on_path_change(self, mock_is_available,
+                                                                   mock_search, monkeypatch):
+        """Test saved lookups are ignored once PATH changes."""
+        import darvis.apps
+
+        find_app_command("browser")
+        clear_app_command_cache()
+        darvis.apps._resolved_apps = None
+        monkeypatch.setenv("PATH", "/somewhere/else")
+
+        find_app_command("browser")
+        assert mock_search.call_count == 2
+
+    @patch('darvis.apps.is_command_available')
+    def test_find_app_command_misses_not_memoized(self, mock_is_available):
+        """Test an app installed after a failed lookup is found next time."""
+        mock_is_available.return_value = False
+        assert find_app_command("firefox") == ""
+
+        mock_is_available.return_value = True
+        assert find_app_command("firefox") == "firefox"
+
+    @patch('darvis.apps._search_app_command', return_value="firefox")
+    @patch('darvis.apps.is_command_available', return_value=True)
+    def test_find_app_command_saves_via_unique_temp_file(self, mock_is_available, mock_search,
+                                                         tmp_path):
+        """Test the saved lookups are written atomically with no temp file left behind."""
+        find_app_command("browser")
+
+        assert [p.name for p in tmp_path.iterdir()] == ["resolved_apps.json"]
+
+    @patch('darvis.apps._search_app_command', return_value="firefox")
+    def test_find_app_command_ignores_malformed_saved_file(self, mock_search, tmp_path):
+        """Test a saved file with unexpected contents is treated as empty."""
+        import json
+        import darvis.apps
+
+        for apps in ([1], {"browser": 1}):
+            (tmp_path / "resolved_apps.json").write_text(
+                json.dumps({"path_hash": darvis.apps._path_hash(), "apps": apps})
+            )
+            clear_app_command_cache()
+            darvis.apps._resolved_apps = None
+
+            assert find_app_command("browser") == "firefox"
+
+        assert mock_search.call_count == 2
+
+    @patch('darvis.apps.is_command_available')
+    @patch('builtins.open', new_callable=mock_open,
+           read_data="[Desktop Entry]\nExec=firefox %u\n")
+    @patch('darvis.apps._desktop_index')
+    @patch('darvis.apps.IS_LINUX', True)
+    @patch('darvis.apps.IS_MACOS', False)
+    def test_find_app_command_desktop_file(self, mock_index, mock_file, mock_is_available):
+        """Test finding app via desktop file parsing."""
+        mock_index.return_value = {"test": "/usr/share/applications/test.desktop"}
+        mock_is_available.side_effect = lambda cmd: cmd == "firefox"
+
+        result = find_app_command("test")
 
         assert result == "firefox"
+        mock_file.assert_called_once_with(
+            "/usr/share/applications/test.desktop", "r", encoding="utf-8", errors="replace"
+        )
 
-    @patch('subprocess.run')
-    def test_is_command_available_true(self, mock_run):
+    def test_find_macos_app_case_insensitive(self, tmp_path):
+        """Test .app bundles are found regardless of case, and new ones noticed."""
+        from darvis.apps import find_macos_app
+
+        (tmp_path / "Visual Studio Code.app").mkdir()
+        with patch('darvis.apps.DESKTOP_DIRS', [str(tmp_path)]):
+            assert find_macos_app("visual studio code") == str(tmp_path / "Visual Studio Code.app")
+            assert find_macos_app("Xcode") == ""
+
+            (tmp_path / "Xcode.app").mkdir()
+            os.utime(tmp_path, ns=(0, 0))  # Don't rely on mtime granularity
+            assert find_macos_app("Xcode") == str(tmp_path / "Xcode.app")
+
+    def test_find_macos_app_mapping_uses_dir_index(self, tmp_path):
+        """Test mapped bundles are checked against the directory listing."""
+        from darvis.apps import find_macos_app
+
+        (tmp_path / "Google Chrome.app").mkdir()
+        mappings = {"chrome": (str(tmp_path / "Chromium.app"), str(tmp_path / "Google Chrome.app"))}
+        with patch('darvis.config.MACOS_APP_MAPPINGS', mappings), \
+                patch('darvis.apps.os.path.exists') as mock_exists:
+            assert find_macos_app("chrome") == str(tmp_path / "Google Chrome.app")
+
+        mock_exists.assert_not_called()
+
+    def test_existing_desktop_dirs_skips_missing_and_symlinked(self, tmp_path):
+        """Test missing directories and symlinked duplicates aren't scanned."""
+        from darvis.apps import _existing_desktop_dirs
+
+        real_dir = tmp_path / "applications"
+        real_dir.mkdir()
+        (tmp_path / "link").symlink_to(real_dir)
+        dirs = [str(real_dir), str(tmp_path / "missing"), str(tmp_path / "link")]
+
+        with patch('darvis.apps.DESKTOP_DIRS', dirs):
+            assert _existing_desktop_dirs() == (str(real_dir),)
+
+    def test_refresh_apps_rebuilds_desktop_index(self, tmp_path):
+        """Test refresh_apps picks up .desktop files added since the first scan."""
+        from darvis.apps import _desktop_index
+
+        with patch('darvis.apps.DESKTOP_DIRS', [str(tmp_path)]):
+            assert _desktop_index() == {}
+            (tmp_path / "Krita.desktop").write_text("[Desktop Entry]\nExec=krita\n")
+            (tmp_path / "stray.desktop").mkdir()  # Not a file, never indexed
+            assert _desktop_index() == {}
+
+            refresh_apps()
+
+            assert _desktop_index() == {"krita": str(tmp_path / "Krita.desktop")}
+
+    @patch('darvis.apps.shutil.which')
+    def test_is_command_available_true(self, mock_which):
         """Test command availability check - available."""
-        mock_run.return_value = MagicMock()
+        mock_which.return_value = "/usr/bin/ls"
 
         result = is_command_available("ls")
 
         assert result is True
-        mock_run.assert_called_once_with(["ls"], capture_output=True, check=False)
+        mock_which.assert_called_once_with("ls")
 
-    @patch('subprocess.run')
-    def test_is_command_available_false(self, mock_run):
+    @patch('darvis.apps.shutil.which')
+    def test_is_command_available_cached(self, mock_which):
+        """Test repeated availability checks reuse the first result."""
+        mock_which.return_value = "/usr/bin/ls"
+
+        assert is_command_available("ls") is True
+        assert is_command_available("ls") is True
+
+        mock_which.assert_called_once()
+
+    @patch('darvis.apps.shutil.which')
+    def test_is_command_available_false(self, mock_which):
         """Test command availability check - not available."""
-        mock_run.side_effect = FileNotFoundError()
+        mock_which.return_value = None
 
         result = is_command_available("nonexistent")
 
         assert result is False
 
+    @patch('subprocess.run')
+    def test_is_command_available_does_not_execute(self, mock_run):
+        """Test the availability probe never launches the command."""
+        is_command_available("firefox")
+
+        mock_run.assert_not_called()
+
     def test_parse_desktop_file_success(self):
         """Test successful desktop file parsing."""
         desktop_content = """[Desktop Entry]
@@ -88,22 +266,40 @@ Type=Application
 
         assert result == ""
 
+    def test_parse_desktop_file_ignores_action_groups(self):
+        """Test only the [Desktop Entry] Exec line is used."""
+        desktop_content = """[Desktop Action new-window]
+Exec=firefox --new-window %u
+
+[Desktop Entry]
+Name=Firefox
+Exec=/usr/lib/firefox/firefox %u
+"""
+
+        with patch('builtins.open', mock_open(read_data=desktop_content)):
+            result = parse_desktop_file("/fake/path/firefox.desktop")
+
+        assert result == "/usr/lib/firefox/firefox"
+
+    @pytest.mark.usefixtures('bare_command_names')
     @patch('subprocess.Popen')
     def test_open_app_web_service(self, mock_popen):
         """Test opening web service."""
         result = open_app("youtube")
 
         assert result == "Opening youtube"
-        mock_popen.assert_called_once_with(["xdg-open", "https://youtube.com"])
+        mock_popen.assert_called_once_with(["xdg-open", "https://youtube.com"], **DETACHED)
 
+    @pytest.mark.usefixtures('bare_command_names')
     @patch('subprocess.Popen')
     def test_open_app_basecamp_web_service(self, mock_popen):
         """Test opening Basecamp web service."""
         result = open_app("basecamp")
 
         assert result == "Opening basecamp"
-        mock_popen.assert_called_once_with(["xdg-open", "https://basecamp.com"])
+        mock_popen.assert_called_once_with(["xdg-open", "https://basecamp.com"], **DETACHED)
 
+    @pytest.mark.usefixtures('bare_command_names')
     @patch('subprocess.Popen')
     def test_open_app_various_web_services(self, mock_popen):
         """Test various web services are properly handled."""
@@ -119,8 +315,19 @@ Type=Application
             mock_popen.reset_mock()
             result = open_app(service)
             assert result == f"Opening {service}"
-            mock_popen.assert_called_once_with(["xdg-open", expected_url])
+            mock_popen.assert_called_once_with(["xdg-open", expected_url], **DETACHED)
+
+    @patch('darvis.apps.webbrowser.open', return_value=True)
+    @patch('subprocess.Popen', side_effect=FileNotFoundError)
+    def test_open_app_web_service_browser_fallback(self, mock_popen, mock_browser):
+        """Test web services fall back to webbrowser when xdg-open is missing."""
+        result = open_app("youtube")
+
+        assert result == "Opening youtube in your browser"
+        mock_popen.assert_called_once()
+        mock_browser.assert_called_once_with("https://youtube.com")
 
+    @pytest.mark.usefixtures('bare_command_names')
     @patch('darvis.apps.find_app_command')
     @patch('subprocess.Popen')
     def test_open_app_bluetooth_manager(self, mock_popen, mock_find):
@@ -131,7 +338,7 @@ Type=Application
 
         assert result == "Opening bluetooth manager"
         mock_find.assert_called_once_with("bluetooth manager")
-        mock_popen.assert_called_once_with(["blueman-manager"])
+        mock_popen.assert_called_once_with(["blueman-manager"], **DETACHED)
 
     @patch('darvis.apps.find_app_command')
     def test_open_app_not_found_error_message(self, mock_find):
@@ -143,6 +350,7 @@ Type=Application
         assert "not installed or not found" in result
         assert "pacman -S" in result
 
+    @pytest.mark.usefixtures('bare_command_names')
     @patch('darvis.apps.find_app_command')
     @patch('subprocess.Popen')
     def test_open_app_local_app_success(self, mock_popen, mock_find):
@@ -152,7 +360,20 @@ Type=Application
         result = open_app("firefox")
 
         assert result == "Opening firefox"
-        mock_popen.assert_called_once_with(["firefox"])
+        mock_popen.assert_called_once_with(["firefox"], **DETACHED)
+
+    @patch('darvis.apps.shutil.which', return_value="/usr/bin/firefox")
+    @patch('darvis.apps.find_app_command')
+    @patch('subprocess.Popen')
+    def test_open_app_launches_resolved_path(self, mock_popen, mock_find, mock_which):
+        """Test launches exec the cached absolute path instead of searching PATH."""
+        mock_find.return_value = "firefox"
+
+        open_app("firefox")
+        open_app("firefox")
+
+        mock_popen.assert_called_with(["/usr/bin/firefox"], **DETACHED)
+        mock_which.assert_called_once_with("firefox")
 
     @patch('darvis.apps.find_app_command')
     def test_open_app_not_found(self, mock_find):
@@ -163,6 +384,17 @@ Type=Application
 
         assert result == "'nonexistent' is not installed or not found on this system. Try: pacman -S nonexistent (on Arch) or check if it's installed in a custom location"
 
+    @pytest.mark.usefixtures('bare_command_names')
+    @patch('darvis.apps._search_app_command', return_value="oldapp")
+    @patch('darvis.apps.is_command_available', return_value=True)
+    @patch('subprocess.Popen', side_effect=FileNotFoundError)
+    def test_open_app_forgets_missing_command(self, mock_popen, mock_is_available, mock_search):
+        """Test a command that no longer exists is searched for again."""
+        open_app("oldapp")
+        open_app("oldapp")
+
+        assert mock_search.call_count == 2
+
     @patch('darvis.apps.find_app_command')
     @patch('subprocess.Popen')
     def test_open_app_launch_error(self, mock_popen, mock_find):
@@ -156,7 +156,7 @@ class TestDarvisGUI(unittest.TestCase):
         gui.display_message = MagicMock()
 
         # Mock threading and AI processing to avoid real execution in tests
-        with patch('threading.Thread') as mock_thread, \
+        with patch('darvis.ui._ai_executor') as mock_executor, \
              patch('darvis.ui.process_ai_query') as mock_ai:
 
             mock_ai.return_value = ("Test response", "session123")
@@ -170,12 +170,10 @@ class TestDarvisGUI(unittest.TestCase):
             gui.display_message.assert_called()
             mock_send_web.assert_called_once_with("test input")
 
-            # Verify thread was started for AI processing
-            mock_thread.assert_called_once()
-            # The thread target should be the processing method
-            call_args = mock_thread.call_args
-            self.assertEqual(call_args[1]['target'], gui._process_ai_query_threaded)
-            self.assertEqual(call_args[1]['args'], ("test input",))
+            # Verify the query was handed to the AI worker
+            mock_executor.submit.assert_called_once_with(
+                gui._process_ai_query_threaded, "test input"
+            )
 
     @patch('tkinter.Tk')
     @patch('tkinter.BooleanVar')
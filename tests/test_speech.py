@@ -5,7 +5,22 @@ Unit tests for the speech recognition module.
 import pytest
 from unittest.mock import patch, MagicMock
 from speech_recognition.exceptions import UnknownValueError, RequestError
-from darvis.speech import speak, listen, list_microphones
+import darvis.speech
+from darvis.speech import speak, listen, list_microphones, contains_wake_word
+
+
+@pytest.fixture(autouse=True)
+def reset_speech_state():
+    """Drop cached speech resources so each test starts cold."""
+    darvis.speech._tts_engine = None
+    darvis.speech._vosk_model = None
+    darvis.speech._recognizer = None
+    darvis.speech.refresh_microphones()
+    yield
+    darvis.speech._tts_engine = None
+    darvis.speech._vosk_model = None
+    darvis.speech._recognizer = None
+    darvis.speech.refresh_microphones()
 
 
 class TestSpeech:
@@ -27,11 +42,54 @@ class TestSpeech:
         mock_import.side_effect = mock_import_func
 
         speak("Hello world")
+        darvis.speech._tts_queue.join()
 
         mock_pyttsx3.init.assert_called_once()
         mock_engine.say.assert_called_once_with("Hello world")
         mock_engine.runAndWait.assert_called_once()
 
+    @patch('builtins.__import__')
+    def test_speak_reuses_engine(self, mock_import):
+        """Test that the TTS engine is initialized once and reused."""
+        mock_pyttsx3 = MagicMock()
+        mock_engine = MagicMock()
+        mock_pyttsx3.init.return_value = mock_engine
+
+        def mock_import_func(name, *args, **kwargs):
+            if name == 'pyttsx3':
+                return mock_pyttsx3
+            return __import__(name, *args, **kwargs)
+
+        mock_import.side_effect = mock_import_func
+
+        speak("First")
+        speak("Second")
+        darvis.speech._tts_queue.join()
+
+        mock_pyttsx3.init.assert_called_once()
+        assert mock_engine.say.call_count == 2
+
+    @patch('builtins.__import__')
+    def test_speak_rebuilds_engine_after_failure(self, mock_import):
+        """Test that a failing engine is replaced on the next utterance."""
+        mock_pyttsx3 = MagicMock()
+        broken_engine = MagicMock()
+        broken_engine.runAndWait.side_effect = RuntimeError("driver died")
+        mock_pyttsx3.init.side_effect = [broken_engine, MagicMock()]
+
+        def mock_import_func(name, *args, **kwargs):
+            if name == 'pyttsx3':
+                return mock_pyttsx3
+            return __import__(name, *args, **kwargs)
+
+        mock_import.side_effect = mock_import_func
+
+        speak("First")
+        speak("Second")
+        darvis.speech._tts_queue.join()
+
+        assert mock_pyttsx3.init.call_count == 2
+
     @patch('builtins.__import__')
     def test_speak_tts_error(self, mock_import):
         """Test TTS error handling."""
@@ -47,6 +105,7 @@ class TestSpeech:
 
         # Should not raise exception
         speak("Hello world")
+        darvis.speech._tts_queue.join()
 
         mock_pyttsx3.init.assert_called_once()
 
@@ -70,6 +129,111 @@ class TestSpeech:
         mock_recognizer.listen.assert_called_once()
         mock_recognizer.recognize_google.assert_called_once_with(mock_audio)
 
+    @patch('darvis.speech.sr')
+    def test_listen_reuses_recognizer(self, mock_sr):
+        """Test the recognizer is shared and calibrated once per microphone."""
+        mock_recognizer = MagicMock()
+        mock_sr.Recognizer.return_value = mock_recognizer
+        mock_sr.Microphone.return_value.__enter__ = MagicMock(return_value=MagicMock())
+        mock_sr.Microphone.return_value.__exit__ = MagicMock(return_value=None)
+        mock_recognizer.recognize_google.return_value = "hello"
+
+        listen()
+        listen()
+
+        mock_sr.Recognizer.assert_called_once()
+        mock_sr.Microphone.assert_called_once_with(device_index=None, sample_rate=16000)
+        mock_recognizer.adjust_for_ambient_noise.assert_called_once()
+        assert mock_recognizer.listen.call_count == 2
+
+    @patch('darvis.speech.sr')
+    def test_listen_keeps_microphone_open(self, mock_sr):
+        """Test the audio stream is opened once and closed on request."""
+        mock_microphone = mock_sr.Microphone.return_value
+        mock_microphone.__enter__ = MagicMock(return_value=MagicMock())
+        mock_microphone.__exit__ = MagicMock(return_value=None)
+        mock_sr.Recognizer.return_value.recognize_google.return_value = "hello"
+
+        listen()
+        listen()
+
+        mock_microphone.__enter__.assert_called_once()
+        mock_microphone.__exit__.assert_not_called()
+
+        darvis.speech.close_microphones()
+
+        mock_microphone.__exit__.assert_called_once_with(None, None, None)
+
+    @patch('darvis.speech.sr')
+    def test_listen_falls_back_to_native_sample_rate(self, mock_sr):
+        """Test a device that rejects 16 kHz is opened at its own rate."""
+        mock_microphone = MagicMock()
+        mock_microphone.__enter__ = MagicMock(return_value=MagicMock())
+        mock_microphone.__exit__ = MagicMock(return_value=None)
+        mock_sr.Microphone.side_effect = [OSError("Invalid sample rate"), mock_microphone]
+        mock_sr.Recognizer.return_value.recognize_google.return_value = "hello"
+
+        assert listen() == "hello"
+
+        mock_sr.Microphone.assert_called_with(device_index=None)
+        mock_microphone.__enter__.assert_called_once()
+
+    @patch('darvis.speech.sr')
+    def test_listen_pauses_stream_between_captures(self, mock_sr):
+        """Test the stream is stopped after a capture and restarted before the next."""
+        mock_source = MagicMock()
+        mock_stream = mock_source.stream.pyaudio_stream
+        mock_stream.is_stopped.return_value = True
+        mock_sr.Microphone.return_value.__enter__ = MagicMock(return_value=mock_source)
+        mock_sr.Microphone.return_value.__exit__ = MagicMock(return_value=None)
+        mock_sr.Recognizer.return_value.recognize_google.return_value = "hello"
+
+        listen()
+        listen()
+
+        assert mock_stream.start_stream.call_count == 2
+        assert mock_stream.stop_stream.call_count == 2
+
+    @patch('darvis.speech.vosk', create=True)
+    @patch('darvis.speech._get_vosk_model')
+    @patch('darvis.speech.sr')
+    def test_listen_uses_vosk_when_configured(self, mock_sr, mock_get_model, mock_vosk):
+        """Test offline recognition is preferred when a Vosk model is loaded."""
+        mock_recognizer = MagicMock()
+        mock_audio = MagicMock()
+        mock_sr.Recognizer.return_value = mock_recognizer
+        mock_sr.Microphone.return_value.__enter__ = MagicMock(return_value=MagicMock())
+        mock_sr.Microphone.return_value.__exit__ = MagicMock(return_value=None)
+        mock_recognizer.listen.return_value = mock_audio
+        mock_get_model.return_value = MagicMock()
+        mock_vosk.KaldiRecognizer.return_value.FinalResult.return_value = '{"text": "Hey Darvis"}'
+
+        result = listen()
+
+        assert result == "hey darvis"
+        mock_recognizer.recognize_google.assert_not_called()
+
+    @patch('darvis.speech.vosk', create=True)
+    @patch('darvis.speech._get_vosk_model')
+    @patch('darvis.speech.sr')
+    def test_listen_falls_back_to_google_when_vosk_hears_nothing(self, mock_sr, mock_get_model,
+                                                                 mock_vosk):
+        """Test an empty Vosk transcript is retried with Google."""
+        mock_recognizer = MagicMock()
+        mock_audio = MagicMock()
+        mock_sr.Recognizer.return_value = mock_recognizer
+        mock_sr.Microphone.return_value.__enter__ = MagicMock(return_value=MagicMock())
+        mock_sr.Microphone.return_value.__exit__ = MagicMock(return_value=None)
+        mock_recognizer.listen.return_value = mock_audio
+        mock_recognizer.recognize_google.return_value = "Hey Darvis"
+        mock_get_model.return_value = MagicMock()
+        mock_vosk.KaldiRecognizer.return_value.FinalResult.return_value = '{"text": ""}'
+
+        result = listen()
+
+        assert result == "hey darvis"
+        mock_recognizer.recognize_google.assert_called_once_with(mock_audio)
+
     @patch('speech_recognition.Recognizer')
     @patch('speech_recognition.Microphone')
     def test_listen_unknown_value_error(self, mock_microphone_class, mock_recognizer_class):
@@ -127,4 +291,28 @@ class TestSpeech:
 
         mock_print.assert_any_call("Available microphones:")
         mock_print.assert_any_call("Index 0: Mic 1")
-        mock_print.assert_any_call("Index 1: Mic 2")
\ No newline at end of file
+        mock_print.assert_any_call("Index 1: Mic 2")
+
+    @patch('darvis.speech.sr')
+    def test_list_microphones_cached(self, mock_sr):
+        """Test device enumeration is cached until refreshed."""
+        mock_sr.Microphone.list_microphone_names.return_value = ["Mic 1"]
+
+        with patch('builtins.print'):
+            list_microphones()
+            list_microphones()
+            mock_sr.Microphone.list_microphone_names.assert_called_once()
+
+            darvis.speech.refresh_microphones()
+            list_microphones()
+
+        assert mock_sr.Microphone.list_microphone_names.call_count == 2
+
+    def test_contains_wake_word(self):
+        """Test wake word detection in transcripts."""
+        assert contains_wake_word("hey darvis open firefox") is True
+        assert contains_wake_word("Hi Jarvis") is True
+        assert contains_wake_word("okay play jarvis what time is it") is True
+        assert contains_wake_word("hello there") is False
+        assert contains_wake_word("hey  darvis") is True
+        assert contains_wake_word("") is False
@@ -83,6 +83,42 @@ class TestDarvisUI(unittest.TestCase):
         mock_text.insert.assert_called()
         mock_text.see.assert_called_with('end')
 
+    @patch('tkinter.Tk')
+    @patch('tkinter.BooleanVar')
+    @patch('darvis.ui.DarvisGUI.init_web_sync')
+    @patch('darvis.ui.DarvisGUI.setup_ui')
+    @patch('darvis.ui.DarvisGUI.bind_events')
+    @patch('darvis.ui.DarvisGUI.setup_system_tray')
+    @patch('darvis.ui.DarvisGUI.start_voice_processing')
+    @patch('darvis.ui.DarvisGUI.start_message_processing')
+    def test_posted_messages_drained_in_one_pass(self, mock_start_msg, mock_start_voice,
+                                                 mock_setup_tray, mock_bind, mock_setup_ui,
+                                                 mock_init_web, mock_boolvar, mock_tk):
+        """Test that every queued message is handled by a single drain."""
+        from darvis.ui import DarvisGUI, MESSAGE_EVENT
+        from darvis.config import MSG_TYPES
+
+        mock_root = MagicMock()
+        mock_tk.return_value = mock_root
+        mock_boolvar.side_effect = [MagicMock(), MagicMock()]
+
+        gui = DarvisGUI()
+        mock_text = MagicMock()
+        gui.text_info = mock_text
+
+        gui._post_message(MSG_TYPES["INSERT"], "one\n")
+        gui._post_message(MSG_TYPES["INSERT"], "two\n", "ai")
+
+        # Each post wakes the GUI thread
+        mock_root.event_generate.assert_called_with(MESSAGE_EVENT, when="tail")
+
+        gui._process_messages()
+
+        # Both messages land in one insert and one scroll
+        mock_text.insert.assert_called_once_with('end', "one\n", (), "two\n", "ai")
+        mock_text.see.assert_called_once_with('end')
+        self.assertEqual(len(gui.msg_queue), 0)
+
     @patch('tkinter.Tk')
     @patch('tkinter.BooleanVar')
     @patch('queue.Queue')
@@ -116,7 +152,7 @@ class TestDarvisUI(unittest.TestCase):
         gui.display_message = MagicMock()
 
         # Mock threading and AI processing to avoid real execution in tests
-        with patch('threading.Thread') as mock_thread, \
+        with patch('darvis.ui._ai_executor') as mock_executor, \
              patch('darvis.ui.process_ai_query') as mock_ai:
 
             mock_ai.return_value = ("Test response", "session123")
@@ -130,12 +166,10 @@ class TestDarvisUI(unittest.TestCase):
             gui.display_message.assert_called()
             mock_send_web.assert_called_once_with("test input")
 
-            # Verify thread was started for AI processing
-            mock_thread.assert_called_once()
-            # The thread target should be the processing method
-            call_args = mock_thread.call_args
-            self.assertEqual(call_args[1]['target'], gui._process_ai_query_threaded)
-            self.assertEqual(call_args[1]['args'], ("test input",))
+            # Verify the query was handed to the AI worker
+            mock_executor.submit.assert_called_once_with(
+                gui._process_ai_query_threaded, "test input"
+            )
 
     @patch('tkinter.Tk')
     @patch('tkinter.BooleanVar')
@@ -170,9 +204,11 @@ class TestDarvisUI(unittest.TestCase):
         gui._process_ai_query_threaded("test query")
 
         # Verify AI was called and response display was scheduled
-        mock_ai_process.assert_called_once_with("test query")
+        mock_ai_process.assert_called_once()
+        self.assertEqual(mock_ai_process.call_args[0][0], "test query")
+        self.assertTrue(callable(mock_ai_process.call_args[1]["on_chunk"]))
         # The _display_ai_response should have been called since we patched after() to execute immediately
-        gui._display_ai_response.assert_called_once_with("AI response")
+        gui._display_ai_response.assert_called_once_with("AI response", failed=False)
 
     @patch('tkinter.Tk')
     @patch('tkinter.BooleanVar')
@@ -207,7 +243,8 @@ class TestDarvisUI(unittest.TestCase):
         gui._process_ai_query_threaded("test query")
 
         # Verify error handling
-        mock_ai_process.assert_called_once_with("test query")
+        mock_ai_process.assert_called_once()
+        self.assertEqual(mock_ai_process.call_args[0][0], "test query")
         # The _display_ai_response should have been called with the error message
         gui._display_ai_response.assert_called_once()
         # Check that the error message was passed to the display function
@@ -244,12 +281,127 @@ class TestDarvisUI(unittest.TestCase):
             gui._display_ai_response("Test response")
 
             # Verify response was displayed
-            gui.display_message.assert_any_call("AI: Test response\n")
+            gui.display_message.assert_any_call("AI: Test response\n", "ai")
             # Verify speak was called
             mock_speak.assert_called_once_with("Test response")
             # Verify glow was scheduled to stop
             mock_root.after.assert_called_once()
 
+    @patch('tkinter.Tk')
+    @patch('tkinter.BooleanVar')
+    @patch('darvis.ui.DarvisGUI.init_web_sync')
+    @patch('darvis.ui.DarvisGUI.setup_ui')
+    @patch('darvis.ui.DarvisGUI.bind_events')
+    @patch('darvis.ui.DarvisGUI.setup_system_tray')
+    @patch('darvis.ui.DarvisGUI.start_voice_processing')
+    @patch('darvis.ui.DarvisGUI.start_message_processing')
+    def test_glow_reset_is_coalesced(self, mock_start_msg, mock_start_voice, mock_setup_tray,
+                                     mock_bind, mock_setup_ui, mock_init_web, mock_boolvar,
+                                     mock_tk):
+        """Test that a new glow reset replaces the pending one."""
+        from darvis.ui import DarvisGUI
+
+        mock_root = MagicMock()
+        mock_tk.return_value = mock_root
+        mock_boolvar.side_effect = [MagicMock(), MagicMock()]
+
+        gui = DarvisGUI()
+        mock_root.after.side_effect = ["job1", "job2"]
+
+        gui._schedule_glow_reset(3000)
+        gui._schedule_glow_reset(3000)
+
+        mock_root.after_cancel.assert_called_once_with("job1")
+        self.assertEqual(gui._glow_reset_job, "job2")
+
+    @patch('tkinter.Tk')
+    @patch('tkinter.BooleanVar')
+    @patch('darvis.ui.DarvisGUI.init_web_sync')
+    @patch('darvis.ui.DarvisGUI.setup_ui')
+    @patch('darvis.ui.DarvisGUI.bind_events')
+    @patch('darvis.ui.DarvisGUI.setup_system_tray')
+    @patch('darvis.ui.DarvisGUI.start_voice_processing')
+    @patch('darvis.ui.DarvisGUI.start_message_processing')
+    def test_streamed_sentences_spoken_as_they_finish(self, mock_start_msg, mock_start_voice,
+                                                      mock_setup_tray, mock_bind, mock_setup_ui,
+                                                      mock_init_web, mock_boolvar, mock_tk):
+        """Test finished sentences are spoken while the response streams in."""
+        from darvis.ui import DarvisGUI
+
+        mock_tk.return_value = MagicMock()
+        mock_boolvar.side_effect = [MagicMock(), MagicMock()]
+
+        gui = DarvisGUI()
+        gui.display_message = MagicMock()
+
+        with patch('darvis.ui.speak') as mock_speak, \
+             patch('darvis.ui.update_waybar_status'):
+            gui._display_ai_chunk("Hello there. How")
+            mock_speak.assert_called_once_with("Hello there.")
+
+            gui._display_ai_chunk(" are you?\n")
+            gui._display_ai_chunk("Fine")
+            gui._display_ai_response("Hello there. How are you?\nFine")
+
+        spoken = [call[0][0] for call in mock_speak.call_args_list]
+        self.assertEqual(spoken, ["Hello there.", "How are you?", "Fine"])
+
+    @patch('tkinter.Tk')
+    @patch('tkinter.BooleanVar')
+    @patch('darvis.ui.DarvisGUI.init_web_sync')
+    @patch('darvis.ui.DarvisGUI.setup_ui')
+    @patch('darvis.ui.DarvisGUI.bind_events')
+    @patch('darvis.ui.DarvisGUI.setup_system_tray')
+    @patch('darvis.ui.DarvisGUI.start_voice_processing')
+    @patch('darvis.ui.DarvisGUI.start_message_processing')
+    def test_error_shown_after_partial_stream(self, mock_start_msg, mock_start_voice,
+                                              mock_setup_tray, mock_bind, mock_setup_ui,
+                                              mock_init_web, mock_boolvar, mock_tk):
+        """Test an error is still displayed when part of the reply was streamed."""
+        from darvis.ui import DarvisGUI
+
+        mock_tk.return_value = MagicMock()
+        mock_boolvar.side_effect = [MagicMock(), MagicMock()]
+
+        gui = DarvisGUI()
+        gui.display_message = MagicMock()
+
+        with patch('darvis.ui.speak'), \
+             patch('darvis.ui.update_waybar_status'):
+            gui._display_ai_chunk("Partial")
+            gui._display_ai_response("AI query timed out", failed=True)
+
+        gui.display_message.assert_any_call("AI: AI query timed out\n", "ai")
+
+    @patch('tkinter.Tk')
+    @patch('tkinter.BooleanVar')
+    @patch('darvis.ui.DarvisGUI.init_web_sync')
+    @patch('darvis.ui.DarvisGUI.setup_ui')
+    @patch('darvis.ui.DarvisGUI.bind_events')
+    @patch('darvis.ui.DarvisGUI.setup_system_tray')
+    @patch('darvis.ui.DarvisGUI.start_voice_processing')
+    @patch('darvis.ui.DarvisGUI.start_message_processing')
+    def test_streamed_reply_ending_in_newline(self, mock_start_msg, mock_start_voice,
+                                              mock_setup_tray, mock_bind, mock_setup_ui,
+                                              mock_init_web, mock_boolvar, mock_tk):
+        """Test no blank line is added after a streamed reply that ended its line."""
+        from darvis.ui import DarvisGUI
+
+        mock_tk.return_value = MagicMock()
+        mock_boolvar.side_effect = [MagicMock(), MagicMock()]
+
+        gui = DarvisGUI()
+        gui.display_message = MagicMock()
+
+        with patch('darvis.ui.speak'), \
+             patch('darvis.ui.update_waybar_status'):
+            gui._display_ai_chunk("Hello there.\n")
+            # process_ai_query strips the final text
+            gui._display_ai_response("Hello there.")
+
+        shown = [call[0][0] for call in gui.display_message.call_args_list]
+        self.assertEqual(shown, ["AI: ", "Hello there.\n", "─" * 50 + "\n"])
+
     @patch('socket.socket')
     def test_init_web_sync_connection_success(self, mock_socket_class):
         """Test web sync initialization with successful connection."""
@@ -378,6 +530,9 @@ class TestDarvisUI(unittest.TestCase):
         # Verify result is an image
         self.assertIsNotNone(result)
         self.assertEqual(result.size, (100, 100))
+        # Eye centers take the glow color; pixels away from the eyes don't change
+        self.assertEqual(result.getpixel((33, 33)), (255, 0, 0, 255))
+        self.assertEqual(result.getpixel((0, 0)), (255, 255, 255, 255))
 
     def test_quit_app(self):
         """Test quitting the application."""
@@ -78,7 +78,6 @@ from darvis.database import (
     add_message,
     get_session_messages,
     update_session_ai_id,
-    get_session_ai_id,
 )
 
 # Initialize database on startup
@@ -315,9 +314,9 @@ def get_session_messages_api(session_id):
 def get_ai_models():
     """Return available Ollama models and the current active backend/model."""
     return jsonify({
-        "backend": darvis_ai.AI_BACKEND,
+        "backend": darvis_ai.session.backend,
         "claude_model": darvis_ai.CLAUDE_MODEL,
-        "ollama_model": darvis_ai.OLLAMA_MODEL,
+        "ollama_model": darvis_ai.session.ollama_model,
         "ollama_models": get_available_ollama_models(),
     })
 
@@ -351,6 +350,59 @@ def handle_disconnect():
     print("Client disconnected")
 
 
+def _run_local_command(message):
+    """Handle messages that launch a local app.
+
+    Args:
+        message: The user's message
+
+    Returns:
+        Reply text, or None if the message should go to the AI instead
+    """
+    command_lower = message.lower()
+    if command_lower.startswith("open "):
+        app_name = command_lower[len("open "):].strip()
+        return f"Opening: {open_app(app_name)}"
+
+    # Check for other local commands
+    local_commands = ["calculator", "terminal", "editor", "browser"]
+    if any(cmd in command_lower for cmd in local_commands):
+        response = open_app(command_lower)
+        if "not installed" in response or "not found" in response:
+            # Fall back to AI
+            return None
+        return f"Result: {response}"
+
+    return None
+
+
+def _run_ai_query(session_id, current_ai_id, message):
+    """Run a query through the AI backend on behalf of a chat session.
+
+    Updates waybar around the call, renames the session when the backend
+    reports a new AI session ID, and saves the assistant reply.
+
+    Args:
+        session_id: Chat session the query belongs to
+        current_ai_id: AI session ID currently stored for the chat session
+        message: The user's message
+
+    Returns:
+        The AI response text
+    """
+    update_waybar_status("thinking", f"Thinking about: {message[:30]}...")
+    response, ai_session_id = process_ai_query(message)
+    # Rename session if we got a new AI session ID
+    if ai_session_id and ai_session_id != current_ai_id:
+        rename_session_by_id(session_id, f"AI-{ai_session_id[:12]}")
+        update_session_ai_id(session_id, ai_session_id)
+    update_waybar_status("success", "Response delivered")
+
+    # Save assistant message
+    add_message(session_id, "assistant", response)
+    return response
+
+
 @socketio.on("chat_message")
 def handle_message(data):
     """Handle incoming messages from the web interface."""
@@ -409,66 +461,17 @@ def handle_message(data):
                 )
                 return
 
-            # Get current AI session ID before processing
-            current_ai_id = get_session_ai_id(session_id)
+            # Current AI session ID, read from the row we already fetched
+            current_ai_id = session_obj["ai_session_id"]
 
             # Save user message
             add_message(session_id, "user", message)
 
-            # Check if it's a local app command
-            command_lower = message.lower()
-            if command_lower.startswith("open "):
-                app_name = command_lower.split("open")[-1].strip()
-                response = open_app(app_name)
-                socketio.emit(
-                    "ai_message",
-                    {"message": f"Opening: {response}", "session_id": session_id},
-                    to=f"user_{user_id}",
-                )
-                return
-
-            # Check for other local commands
-            local_commands = ["calculator", "terminal", "editor", "browser"]
-            if any(cmd in command_lower for cmd in local_commands):
-                response = open_app(command_lower)
-                if "not installed" in response or "not found" in response:
-                    # Fall back to AI
-                    update_waybar_status(
-                        "thinking", f"Thinking about: {message[:30]}..."
-                    )
-                    response, ai_session_id = process_ai_query(message)
-                    # Rename session if we got a new AI session ID
-                    if ai_session_id and ai_session_id != current_ai_id:
-                        short_id = ai_session_id[:12] if ai_session_id else "new"
-                        rename_session_by_id(session_id, f"AI-{short_id}")
-                        update_session_ai_id(session_id, ai_session_id)
-                    update_waybar_status("success", "Response delivered")
-                    socketio.emit(
-                        "ai_message",
-                        {"message": response, "session_id": session_id},
-                        to=f"user_{user_id}",
-                    )
-                else:
-                    socketio.emit(
-                        "ai_message",
-                        {"message": f"Result: {response}", "session_id": session_id},
-                        to=f"user_{user_id}",
-                    )
-                return
-
-            # Default to AI processing
-            update_waybar_status("thinking", f"Thinking about: {message[:30]}...")
-            response, ai_session_id = process_ai_query(message)
-            # Rename session if we got a new AI session ID
-            if ai_session_id and ai_session_id != current_ai_id:
-                short_id = ai_session_id[:12] if ai_session_id else "new"
-                rename_session_by_id(session_id, f"AI-{short_id}")
-                update_session_ai_id(session_id, ai_session_id)
-            update_waybar_status("success", "Response delivered")
-
-            # Save assistant message
-            add_message(session_id, "assistant", response)
-            print(f"DEBUG: assistant message saved to DB, emitting ai_message to user_{user_id} with session_id={session_id}")
+            # Local app commands first, AI for everything else
+            response = _run_local_command(message)
+            if response is None:
+                response = _run_ai_query(session_id, current_ai_id, message)
+            print(f"DEBUG: emitting ai_message to user_{user_id} with session_id={session_id}")
 
             # Emit ONLY to this user's room
             socketio.emit(